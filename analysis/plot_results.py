@@ -1,48 +1,111 @@
+import os
 import sys
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
-def clean_latency_column(df):
-    # Convert column to numeric, force errors to NaN
-    df['latency_ms'] = pd.to_numeric(df['latency_ms'], errors='coerce')
-    # Drop rows where latency is NaN (original ERR values)
-    df = df.dropna(subset=['latency_ms'])
-    return df
+# allow `python analysis/plot_results.py` from the repo root to import the simulator package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from simulator.histogram import LatencyHistogram
 
-def plot_latency_cdf(df, outfile):
-    vals = np.sort(df['latency_ms'].values)
-    p = np.arange(len(vals)) / float(len(vals))
+# bookkeeping rows whose latency is not a client op latency
+INTERNAL_OPS = {"relocate", "migrate", "cache", "energy", "rebuild", "rebalance", "scrub", "crash", "node_fail", "node_recover"}
+CHUNK_ROWS = 1_000_000
 
+def iter_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield the op/latency_ms/node_id columns of a run log in bounded-size DataFrames."""
+    cols = ["op", "latency_ms", "node_id"]
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=cols):
+            yield batch.to_pandas()
+    elif ext == ".npy":
+        arr = np.load(path, mmap_mode="r")
+        for start in range(0, len(arr), chunk_rows):
+            part = arr[start:start + chunk_rows]
+            yield pd.DataFrame({"op": np.char.decode(part["op"], "utf-8"),
+                                "latency_ms": part["latency_ms"], "node_id": part["node_id"]})
+    else:
+        yield from pd.read_csv(path, usecols=cols, chunksize=chunk_rows)
+
+class RunStats:
+    """Streaming latency histograms of one run: overall, per op type and per node."""
+    def __init__(self, name):
+        self.name = name
+        self.overall = LatencyHistogram()
+        self.by_op = {}
+        self.by_node = {}
+        self.errors = 0
+
+    def add_chunk(self, df, include_internal=False):
+        lat = pd.to_numeric(df["latency_ms"], errors="coerce")
+        keep = np.ones(len(df), dtype=bool) if include_internal else ~df["op"].isin(INTERNAL_OPS).to_numpy()
+        # ERR (csv) / NaN (parquet, npy) latencies are failed ops
+        self.errors += int((keep & lat.isna().to_numpy()).sum())
+        keep &= lat.notna().to_numpy()
+        df, lat = df[keep], lat[keep]
+        self.overall.add(lat.to_numpy())
+        for table, col in ((self.by_op, df["op"]), (self.by_node, df["node_id"])):
+            for value, part in lat.groupby(col.to_numpy()):
+                table.setdefault(value, LatencyHistogram()).add(part.to_numpy())
+
+def analyze(path, include_internal=False, chunk_rows=CHUNK_ROWS):
+    stats = RunStats(os.path.splitext(os.path.basename(path))[0])
+    for chunk in iter_chunks(path, chunk_rows):
+        stats.add_chunk(chunk, include_internal)
+    return stats
+
+def print_table(title, hists):
+    print(f"  {title:<16} {'ops':>10} {'avg':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for key, h in hists:
+        print(f"  {str(key):<16} {h.total:>10} {h.mean:>9.3f} {h.quantile(0.5):>9.3f} {h.quantile(0.95):>9.3f} "
+              f"{h.quantile(0.99):>9.3f} {h.max:>9.3f}")
+
+def print_stats(stats):
+    h = stats.overall
+    print(f"== {stats.name}")
+    print(f"Ops: {h.total} (+{stats.errors} failed)")
+    print(f"Avg latency (ms): {h.mean}")
+    print(f"P95 (ms): {h.quantile(0.95)}")
+    print(f"P99 (ms): {h.quantile(0.99)}")
+    print_table("op", sorted(stats.by_op.items()))
+    # node -1: ops spanning several nodes (stripe writes, degraded reads)
+    print_table("node", sorted(stats.by_node.items()))
+
+def plot_latency_cdf(runs, outfile, by_op=False):
     plt.figure(figsize=(7,5))
-    plt.plot(vals, p)
+    for stats in runs:
+        series = sorted(stats.by_op.items()) if by_op else [(None, stats.overall)]
+        for op, h in series:
+            vals, p = h.cdf()
+            label = stats.name if op is None else f"{stats.name}:{op}"
+            plt.step(vals, p, where="post", label=label)
     plt.xlabel("Latency (ms)")
     plt.ylabel("CDF")
     plt.title("Latency CDF")
     plt.grid(True)
+    if len(runs) > 1 or by_op:
+        plt.legend()
     plt.savefig(outfile)
     plt.close()
     print(f"[+] Saved CDF plot: {outfile}")
 
-def print_stats(df):
-    ops = len(df)
-    avg_lat = df['latency_ms'].mean()
-    p95 = df['latency_ms'].quantile(0.95)
-    p99 = df['latency_ms'].quantile(0.99)
-
-    print(f"Ops: {ops}")
-    print(f"Avg latency (ms): {avg_lat}")
-    print(f"P95 (ms): {p95}")
-    print(f"P99 (ms): {p99}")
-
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python analysis/plot_results.py <csv_file>")
-        sys.exit(1)
-
-    csv_file = sys.argv[1]
-    df = pd.read_csv(csv_file)
+    parser = argparse.ArgumentParser(description="Latency stats and CDF of one or more run logs (.csv/.parquet/.npy)")
+    parser.add_argument("logs", nargs="+")
+    parser.add_argument("--out", default=None, help="plot file (default: next to the first log)")
+    parser.add_argument("--by-op", action="store_true", help="one CDF line per op type")
+    parser.add_argument("--include-internal", action="store_true", help="also count relocate/cache/energy rows")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows read at a time")
+    args = parser.parse_args()
 
-    df = clean_latency_column(df)
-    print_stats(df)
-    plot_latency_cdf(df, outfile=csv_file.replace(".csv", "_latency_cdf.png"))
+    runs = [analyze(path, args.include_internal, args.chunk_rows) for path in args.logs]
+    for stats in runs:
+        print_stats(stats)
+    outfile = args.out
+    if outfile is None:
+        base = os.path.splitext(args.logs[0])[0]
+        outfile = base + ("_latency_cdf.png" if len(runs) == 1 else "_compare_latency_cdf.png")
+    plot_latency_cdf(runs, outfile, by_op=args.by_op)
@@ -0,0 +1,41 @@
+# bench_metrics.py
+"""
+Instrumentation overhead: the same run with metrics on and off, in-memory store.
+Runs alternate on/off so load on the machine hits both alike; reports the median
+(and quartiles) of the per-pair CPU-time ratios.
+
+    python -m benchmarks.bench_metrics
+    python -m benchmarks.bench_metrics --modes draid --ops 30000 --pairs 25
+"""
+import argparse
+import statistics
+import time
+from simulator.run_experiment import Simulation
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["draid", "draid_predict_energy"])
+    parser.add_argument("--ops", type=int, default=30000)
+    parser.add_argument("--pairs", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'mode':<22} {'on_s':>7} {'off_s':>7} {'overhead':>9} {'q1':>7} {'q3':>7}")
+    for mode in args.modes:
+        sims = {on: Simulation(mode=mode, store="memory", logpath=None, verbose=False, max_ops=args.ops,
+                               duration=float("inf"), seed=args.seed, metrics=on) for on in (True, False)}
+        for sim in sims.values():
+            sim.run()       # warm-up
+        cpu = {True: [], False: []}
+        for i in range(args.pairs):
+            for on in ((True, False) if i % 2 else (False, True)):
+                t0 = time.process_time()
+                sims[on].run()
+                cpu[on].append(time.process_time() - t0)
+        ratios = [on / off - 1 for on, off in zip(cpu[True], cpu[False])]
+        q1, med, q3 = statistics.quantiles(ratios, n=4)
+        print(f"{mode:<22} {statistics.median(cpu[True]):>7.3f} {statistics.median(cpu[False]):>7.3f} "
+              f"{med:>8.1%} {q1:>7.1%} {q3:>7.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# bench_parity.py
+"""
+Micro-benchmark: vectorized parity engine vs. the original per-byte XOR loop.
+
+    python -m benchmarks.bench_parity
+    python -m benchmarks.bench_parity --sizes 512 4096 65536 --k 4 --r 2
+"""
+import argparse
+import os
+import timeit
+from simulator.parity import xor_parity, rs_encode, rs_reconstruct
+
+def legacy_xor_parity(blocks):
+    """The original pure-Python implementation, kept here as the reference."""
+    if len(blocks) == 0:
+        return b""
+    length = len(blocks[0])
+    blocks = [b.ljust(length, b'\x00')[:length] for b in blocks]
+    result = bytearray(length)
+    for b in blocks:
+        for i, val in enumerate(b):
+            result[i] ^= val
+    return bytes(result)
+
+def best_us(fn, repeat):
+    number = max(1, repeat)
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 4096, 16384, 65536, 262144])
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--r", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'block':>8} {'legacy_xor_us':>14} {'xor_us':>10} {'speedup':>8} {'rs_enc_us':>10} {'rs_dec_us':>10}")
+    for size in args.sizes:
+        blocks = [os.urandom(size) for _ in range(args.k)]
+        assert xor_parity(blocks) == legacy_xor_parity(blocks)
+        # the legacy loop is slow: scale its repeat count down with block size
+        legacy = best_us(lambda: legacy_xor_parity(blocks), max(1, 65536 // size))
+        fast = best_us(lambda: xor_parity(blocks), 200)
+
+        parities = rs_encode(blocks, args.r)
+        chunks = {i: b for i, b in enumerate(blocks + parities)}
+        lost = list(range(args.r))                      # worst case: lose r data chunks
+        survivors = {i: c for i, c in chunks.items() if i not in lost}
+        rebuilt = rs_reconstruct(survivors, args.k, args.r, lost)
+        assert all(rebuilt[i] == blocks[i] for i in lost)
+        enc = best_us(lambda: rs_encode(blocks, args.r), 200)
+        dec = best_us(lambda: rs_reconstruct(survivors, args.k, args.r, lost), 200)
+        print(f"{size:>8} {legacy:>14.1f} {fast:>10.1f} {legacy / fast:>7.0f}x {enc:>10.1f} {dec:>10.1f}")
+
+if __name__ == "__main__":
+    main()
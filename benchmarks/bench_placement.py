@@ -0,0 +1,67 @@
+# bench_placement.py
+"""
+Placement engines from small to large clusters, computed from the layouts alone
+(no I/O): per-node load balance, rebuild parallelism when one node fails, and
+the share of chunks a rebalance moves when one node joins or leaves.
+
+    python -m benchmarks.bench_placement
+    python -m benchmarks.bench_placement --nodes 6 24 96 384 --stripes-per-node 100
+
+Rebuild reads follow Controller.read_any_k: the first k surviving chunks of each
+affected stripe. Parallelism is total reads / reads of the busiest source node,
+i.e. how many nodes' worth of bandwidth the rebuild can use (ideal: N - 1).
+"""
+import argparse
+import time
+from collections import Counter
+from simulator.constants import BLOCKS_PER_STRIPE, PARITY_BLOCKS
+from simulator.placement import PLACEMENTS, make_placement, stable_order
+
+K, WIDTH = BLOCKS_PER_STRIPE, BLOCKS_PER_STRIPE + PARITY_BLOCKS
+
+def layout(kind, stripes, members):
+    engine = make_placement(kind, WIDTH)
+    return [tuple(engine.place(s, members)) for s in range(stripes)]
+
+def moved_fraction(kind, before, members):
+    """Share of chunks whose node changes when the layout is recomputed for `members`."""
+    after = layout(kind, len(before), members)
+    moved = sum(a != b for old, new in zip(before, after) for a, b in zip(old, stable_order(new, old)))
+    return moved / (len(before) * WIDTH)
+
+def rebuild_parallelism(before, failed):
+    reads = Counter()
+    for positions in before:
+        if failed in positions:
+            reads.update([p for p in positions if p != failed][:K])
+    total = sum(reads.values())
+    return (total / max(reads.values()) if total else 0.0), len(reads)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engines", nargs="+", choices=PLACEMENTS, default=PLACEMENTS)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[6, 12, 24, 48, 96, 192, 384])
+    parser.add_argument("--stripes-per-node", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"k+r={K}+{WIDTH - K}, {args.stripes_per_node} stripes per node")
+    print(f"{'engine':>12} {'nodes':>6} {'load_max/avg':>12} {'rebuild_par':>11} {'sources':>7} "
+          f"{'add_moved':>9} {'remove_moved':>12} {'place_us':>9}")
+    for kind in args.engines:
+        for n in args.nodes:
+            stripes = n * args.stripes_per_node
+            members = tuple(range(n))
+            t0 = time.perf_counter()
+            before = layout(kind, stripes, members)
+            place_us = (time.perf_counter() - t0) / stripes * 1e6
+            load = Counter(p for positions in before for p in positions)
+            balance = max(load.values()) / (stripes * WIDTH / n)
+            par, sources = rebuild_parallelism(before, failed=0)
+            added = moved_fraction(kind, before, members + (n,))
+            removed = moved_fraction(kind, before, members[1:])
+            print(f"{kind:>12} {n:>6} {balance:>12.3f} {par:>11.1f} {sources:>7} "
+                  f"{added:>9.3f} {removed:>12.3f} {place_us:>9.2f}")
+    print("ideal: load_max/avg 1.0, rebuild_par N-1, add_moved 1/(N+1), remove_moved 1/N")
+
+if __name__ == "__main__":
+    main()
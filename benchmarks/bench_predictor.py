@@ -0,0 +1,68 @@
+# bench_predictor.py
+"""
+Hot-stripe predictor engines vs. the Zipf ground truth (WorkloadGenerator.hot_stripes).
+Every engine observes the same access stream; at each checkpoint the stripes it
+calls hot are compared with the generator's hot set.
+
+    python -m benchmarks.bench_predictor
+    python -m benchmarks.bench_predictor --stripes 100000 --ops 500000 --window 20000 --threshold 3
+"""
+import argparse
+import time
+from simulator.client import WorkloadGenerator
+from simulator.predictor import PREDICTORS, make_predictor
+
+def precision_recall(predicted, truth):
+    tp = len(predicted & truth)
+    precision = tp / len(predicted) if predicted else 0.0
+    recall = tp / len(truth) if truth else 0.0
+    return precision, recall
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engines", nargs="+", choices=sorted(PREDICTORS), default=["window", "decay", "cms", "sgd"])
+    parser.add_argument("--stripes", type=int, default=1000)
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--zipf-s", type=float, default=1.2)
+    parser.add_argument("--hot-fraction", type=float, default=0.1)
+    parser.add_argument("--window", type=int, default=5000)
+    parser.add_argument("--threshold", type=float, default=4)
+    parser.add_argument("--checkpoints", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    gen = WorkloadGenerator(mode="zipf", stripes=args.stripes, zipf_s=args.zipf_s,
+                            hot_fraction=args.hot_fraction, seed=args.seed)
+    _, stream, _ = gen.generate(args.ops)
+    stream = stream.tolist()
+    truth = set(gen.hot_stripes)
+    every = max(1, args.ops // args.checkpoints)
+
+    print(f"{args.ops} ops over {args.stripes} stripes, {len(truth)} truly hot "
+          f"(window={args.window}, threshold={args.threshold})")
+    print(f"{'engine':>8} {'precision':>10} {'recall':>8} {'f1':>6} {'observe_us':>11}")
+    for name in args.engines:
+        kwargs = {"top_k": len(truth)} if name == "cms" else {}
+        try:
+            pred = make_predictor(name, args.window, args.threshold, **kwargs)
+        except RuntimeError as e:
+            print(f"{name:>8} skipped: {e}")
+            continue
+        scores = []
+        busy = 0.0
+        for start in range(0, args.ops, every):
+            chunk = stream[start:start + every]
+            t0 = time.perf_counter()
+            for s in chunk:
+                pred.observe(s)
+            busy += time.perf_counter() - t0
+            hot = {s for s in range(args.stripes) if pred.is_hot(s)}
+            scores.append(precision_recall(hot, truth))
+        # average over checkpoints (the first one includes warm-up)
+        p = sum(s[0] for s in scores) / len(scores)
+        r = sum(s[1] for s in scores) / len(scores)
+        f1 = 2 * p * r / (p + r) if p + r else 0.0
+        print(f"{name:>8} {p:>10.3f} {r:>8.3f} {f1:>6.3f} {busy / args.ops * 1e6:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# suite.py
+"""
+Benchmark suite for the simulator's hot paths, with regression tracking.
+Every benchmark uses fixed seeds and op counts and reports host ops/s (best
+of --repeat runs); results are saved as JSON and compared against a baseline.
+
+    python -m benchmarks.suite run --out bench_baseline.json        # e.g. on main
+    python -m benchmarks.suite run --out bench_current.json         # on a branch
+    python -m benchmarks.suite compare bench_baseline.json bench_current.json --threshold 0.1
+
+compare exits with status 1 if any benchmark slowed down by more than the
+threshold, so it can gate CI. End-to-end runs also record their simulated
+throughput, which is deterministic: a change there means the simulation's
+behaviour changed, not its speed, and is reported separately.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SEED = 42
+
+def timed_best(fn, repeat):
+    """Best wall time of fn() over `repeat` calls (fn does a fixed amount of work)."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def bench_xor_parity(n):
+    from simulator.parity import xor_parity
+    from simulator.constants import BLOCKS_PER_STRIPE, BLOCK_SIZE
+    blocks = [os.urandom(BLOCK_SIZE) for _ in range(BLOCKS_PER_STRIPE)]
+    def work():
+        for _ in range(n):
+            xor_parity(blocks)
+    return work
+
+def bench_node_io(n, store, op, tmp):
+    from simulator.clock import SimClock
+    from simulator.network import NetworkSimulator
+    from simulator.node import Node
+    from simulator.constants import BLOCK_SIZE
+    import random
+    random.seed(SEED)
+    node = Node(0, os.path.join(tmp, f"node_{store}_{op}"), NetworkSimulator(clock=SimClock()), store=store)
+    data = os.urandom(BLOCK_SIZE)
+    names = [f"stripe{i}_d0" for i in range(min(n, 1024))]
+    for name in names:
+        node.write_chunk(name, data)
+    def work():
+        for i in range(n):
+            if op == "write":
+                node.write_chunk(names[i % len(names)], data)
+            else:
+                node.read_chunk(names[i % len(names)])
+    return work
+
+def bench_next_op(n):
+    from simulator.client import WorkloadGenerator
+    def work():
+        gen = WorkloadGenerator(mode="zipf", stripes=1000, seed=SEED)
+        for _ in range(n):
+            gen.next_op()
+    return work
+
+def bench_observe(n, kind):
+    import numpy as np
+    from simulator.predictor import make_predictor
+    stream = np.random.default_rng(SEED).zipf(1.2, n) % 1000
+    stream = stream.tolist()
+    def work():
+        pred = make_predictor(kind, window_size=300, threshold=15)
+        for s in stream:
+            pred.observe(s)
+    return work
+
+def bench_end_to_end(n, mode, tmp, sim):
+    from simulator.run_experiment import run
+    def work():
+        # the per-run console report is not part of the measurement
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = run(mode=mode, duration=float("inf"), max_ops=n, seed=SEED, store="packed",
+                          logpath=os.path.join(tmp, f"{mode}.csv"), base_dir=os.path.join(tmp, f"data_{mode}"))
+        sim["sim_throughput_ops"] = round(summary["throughput_ops"], 6)
+    return work
+
+def benchmarks(scale, tmp):
+    """name -> (ops per call, work factory); factories take (sim extras dict)."""
+    n = lambda base: max(1, int(base * scale))
+    table = {
+        "xor_parity": (n(20000), lambda sim: bench_xor_parity(n(20000))),
+        "workload_next_op": (n(50000), lambda sim: bench_next_op(n(50000))),
+    }
+    for store in ("file", "packed", "memory"):
+        for op in ("write", "read"):
+            table[f"node_{op}_{store}"] = (n(5000), lambda sim, s=store, o=op: bench_node_io(n(5000), s, o, tmp))
+    for kind in ("window", "decay", "cms"):
+        table[f"predictor_observe_{kind}"] = (n(100000), lambda sim, k=kind: bench_observe(n(100000), k))
+    for mode in ("baseline", "draid", "draid_predict_energy"):
+        table[f"e2e_{mode}"] = (n(5000), lambda sim, m=mode: bench_end_to_end(n(5000), m, tmp, sim))
+    return table
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_suite(out, scale=1.0, repeat=3, only=None):
+    import numpy as np
+    tmp = tempfile.mkdtemp(prefix="draid_bench_")
+    results = {}
+    try:
+        for name, (ops, factory) in benchmarks(scale, tmp).items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            sim = {}
+            best = timed_best(factory(sim), repeat)
+            results[name] = {"ops": ops, "repeat": repeat, "best_s": best,
+                             "ops_per_s": ops / best, "us_per_op": best / ops * 1e6, **sim}
+            print(f"{name:<28} {ops:>8} ops {results[name]['ops_per_s']:>14.0f} ops/s "
+                  f"{results[name]['us_per_op']:>10.3f} us/op")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    doc = {"meta": {"commit": git_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(), "numpy": np.__version__,
+                    "machine": platform.machine(), "scale": scale, "seed": SEED},
+           "results": results}
+    with open(out, "w") as f:
+        json.dump(doc, f, indent=2)
+    print(f"[+] Saved {len(results)} results: {out}")
+    return doc
+
+def compare(baseline_path, current_path, threshold=0.1):
+    """Print per-benchmark speed ratios; returns the names that regressed beyond threshold."""
+    with open(baseline_path) as f:
+        base = json.load(f)
+    with open(current_path) as f:
+        cur = json.load(f)
+    if base["meta"].get("scale") != cur["meta"].get("scale"):
+        print(f"warning: different --scale ({base['meta'].get('scale')} vs {cur['meta'].get('scale')})")
+    print(f"baseline {base['meta'].get('commit')} vs current {cur['meta'].get('commit')}, "
+          f"regression threshold {threshold:.0%}")
+    print(f"{'benchmark':<28} {'base ops/s':>14} {'cur ops/s':>14} {'change':>8}")
+    regressions = []
+    for name in sorted(set(base["results"]) | set(cur["results"])):
+        b, c = base["results"].get(name), cur["results"].get(name)
+        if b is None or c is None:
+            print(f"{name:<28} {'only in ' + ('current' if b is None else 'baseline'):>38}")
+            continue
+        change = c["ops_per_s"] / b["ops_per_s"] - 1.0
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change > threshold:
+            flag = "  faster"
+        if "sim_throughput_ops" in b and b.get("sim_throughput_ops") != c.get("sim_throughput_ops"):
+            flag += f"  (simulated ops/s {b['sim_throughput_ops']:.1f} -> {c.get('sim_throughput_ops', float('nan')):.1f})"
+        print(f"{name:<28} {b['ops_per_s']:>14.0f} {c['ops_per_s']:>14.0f} {change:>+8.1%}{flag}")
+    print(f"{len(regressions)} regression(s)" + (": " + ", ".join(regressions) if regressions else ""))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulator benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="run the benchmarks and save JSON results")
+    p_run.add_argument("--out", default="bench_results.json")
+    p_run.add_argument("--scale", type=float, default=1.0, help="multiply every op count (e.g. 0.1 for a quick run)")
+    p_run.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the best is kept")
+    p_run.add_argument("--only", nargs="+", default=None, help="run benchmarks whose name contains any of these")
+    p_cmp = sub.add_parser("compare", help="flag regressions against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown (fraction)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run_suite(args.out, scale=args.scale, repeat=args.repeat, only=args.only)
+    else:
+        sys.exit(1 if compare(args.baseline, args.current, args.threshold) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# workloads.py
+"""
+Workload trace builders. Each returns (ops, stripes, indices) arrays in the
+format of WorkloadGenerator.generate (op 0 = read, 1 = write) and can be saved
+for replay with `python -m simulator.run_experiment --trace <file>`:
+
+    python -m experiments.workloads bursty --ops 1000000 --stripes 1000000 --out experiments/bursty_trace.npy
+"""
+import argparse
+import numpy as np
+from simulator.client import WorkloadGenerator, save_trace
+from simulator.constants import BLOCKS_PER_STRIPE
+
+def seq_trace(n, stripes, read_ratio=0.0, seed=None):
+    """Sequential scan over every block of every stripe (backup / rebuild-like)."""
+    return WorkloadGenerator(mode="seq", stripes=stripes, read_ratio=read_ratio, seed=seed).generate(n)
+
+def rw_ratio_trace(n, stripes, read_ratio=0.7, zipf_s=1.2, seed=None):
+    """Zipf-skewed stripes with a fixed read/write mix."""
+    return WorkloadGenerator(mode="zipf", stripes=stripes, zipf_s=zipf_s,
+                             read_ratio=read_ratio, seed=seed).generate(n)
+
+def bursty_trace(n, stripes, read_ratio=0.7, zipf_s=1.2, burst_len=2000, burst_every=10000,
+                 burst_stripes=32, burst_write_ratio=0.9, seed=None):
+    """
+    Zipf background traffic interrupted every `burst_every` ops by a burst of
+    `burst_len` write-heavy ops on a small random set of `burst_stripes` stripes
+    (a new set per burst), e.g. a log flush or a hot table being rewritten.
+    """
+    rng = np.random.default_rng(seed)
+    ops, st, idx = rw_ratio_trace(n, stripes, read_ratio, zipf_s, seed=rng.integers(1 << 32))
+    if n == 0:
+        return ops, st, idx
+    pos = np.arange(n)
+    in_burst = (pos % burst_every) >= (burst_every - burst_len)
+    burst_id = pos // burst_every
+    # one random hot set per burst
+    sets = rng.integers(0, stripes, (int(burst_id[-1]) + 1, burst_stripes))
+    pick = rng.integers(0, burst_stripes, n)
+    st = np.where(in_burst, sets[burst_id, pick], st)
+    ops = np.where(in_burst, (rng.random(n) < burst_write_ratio).astype(np.uint8), ops)
+    idx = np.where(in_burst, rng.integers(0, BLOCKS_PER_STRIPE, n), idx)
+    return ops, st, idx
+
+PATTERNS = {"seq": seq_trace, "rw": rw_ratio_trace, "bursty": bursty_trace}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pattern", choices=sorted(PATTERNS))
+    parser.add_argument("--ops", type=int, default=100000)
+    parser.add_argument("--stripes", type=int, default=200)
+    parser.add_argument("--read-ratio", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=str, required=True)
+    args = parser.parse_args()
+    kwargs = {"seed": args.seed}
+    if args.read_ratio is not None:
+        kwargs["read_ratio"] = args.read_ratio
+    trace = save_trace(args.out, *PATTERNS[args.pattern](args.ops, args.stripes, **kwargs))
+    print(f"Saved {len(trace)} ops ({trace.nbytes / 1e6:.1f} MB) to {args.out}")
@@ -0,0 +1,260 @@
+# cache.py
+from collections import OrderedDict, defaultdict
+from simulator.constants import BLOCK_SIZE, BLOCKS_PER_STRIPE
+
+# ---------------------------------------------------------------------------
+# Eviction policies. All work on entry counts (every cached stripe has the
+# same size); insert() returns the keys it evicted to make room.
+# ---------------------------------------------------------------------------
+
+class LRUPolicy:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def touch(self, key):
+        self.entries.move_to_end(key)
+
+    def insert(self, key):
+        evicted = []
+        while len(self.entries) >= self.capacity:
+            evicted.append(self.entries.popitem(last=False)[0])
+        self.entries[key] = True
+        return evicted
+
+    def remove(self, key):
+        self.entries.pop(key, None)
+
+class LFUPolicy:
+    """O(1) LFU: frequency buckets, LRU order inside a bucket."""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.freq = {}
+        self.buckets = defaultdict(OrderedDict)
+        self.min_freq = 0
+
+    def __contains__(self, key):
+        return key in self.freq
+
+    def __len__(self):
+        return len(self.freq)
+
+    def touch(self, key):
+        f = self.freq[key]
+        del self.buckets[f][key]
+        if not self.buckets[f]:
+            del self.buckets[f]
+            if self.min_freq == f:
+                self.min_freq = f + 1
+        self.freq[key] = f + 1
+        self.buckets[f + 1][key] = True
+
+    def insert(self, key):
+        evicted = []
+        while len(self.freq) >= self.capacity:
+            while self.min_freq not in self.buckets:
+                self.min_freq += 1
+            victim, _ = self.buckets[self.min_freq].popitem(last=False)
+            if not self.buckets[self.min_freq]:
+                del self.buckets[self.min_freq]
+            del self.freq[victim]
+            evicted.append(victim)
+        self.freq[key] = 1
+        self.buckets[1][key] = True
+        self.min_freq = 1
+        return evicted
+
+    def remove(self, key):
+        f = self.freq.pop(key, None)
+        if f is not None:
+            del self.buckets[f][key]
+            if not self.buckets[f]:
+                del self.buckets[f]
+
+class ARCPolicy:
+    """
+    Adaptive Replacement Cache (Megiddo & Modha): recency list T1, frequency
+    list T2, ghost lists B1/B2 steering the target size p of T1.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.p = 0
+        self.t1, self.t2, self.b1, self.b2 = OrderedDict(), OrderedDict(), OrderedDict(), OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.t1 or key in self.t2
+
+    def __len__(self):
+        return len(self.t1) + len(self.t2)
+
+    def touch(self, key):
+        if key in self.t1:
+            del self.t1[key]
+            self.t2[key] = True
+        else:
+            self.t2.move_to_end(key)
+
+    def _replace(self, key, evicted):
+        if self.t1 and (len(self.t1) > self.p or (key in self.b2 and len(self.t1) == self.p)) or not self.t2:
+            victim, _ = self.t1.popitem(last=False)
+            self.b1[victim] = True
+        else:
+            victim, _ = self.t2.popitem(last=False)
+            self.b2[victim] = True
+        evicted.append(victim)
+
+    def insert(self, key):
+        c = self.capacity
+        evicted = []
+        if key in self.b1:
+            self.p = min(c, self.p + max(len(self.b2) // len(self.b1), 1))
+            if len(self) >= c:
+                self._replace(key, evicted)
+            del self.b1[key]
+            self.t2[key] = True
+            return evicted
+        if key in self.b2:
+            self.p = max(0, self.p - max(len(self.b1) // len(self.b2), 1))
+            if len(self) >= c:
+                self._replace(key, evicted)
+            del self.b2[key]
+            self.t2[key] = True
+            return evicted
+        if len(self.t1) + len(self.b1) >= c:
+            if len(self.t1) < c:
+                self.b1.popitem(last=False)
+                if len(self) >= c:
+                    self._replace(key, evicted)
+            else:
+                evicted.append(self.t1.popitem(last=False)[0])
+        else:
+            total = len(self.t1) + len(self.t2) + len(self.b1) + len(self.b2)
+            if total >= c:
+                if total >= 2 * c:
+                    self.b2.popitem(last=False)
+                if len(self) >= c:
+                    self._replace(key, evicted)
+        self.t1[key] = True
+        return evicted
+
+    def remove(self, key):
+        self.t1.pop(key, None)
+        self.t2.pop(key, None)
+
+CACHE_POLICIES = {"lru": LRUPolicy, "lfu": LFUPolicy, "arc": ARCPolicy}
+WRITE_POLICIES = ["invalidate", "through"]
+
+class HotStripeCache:
+    """
+    Bounded hot-stripe cache tier on a fast node. A cached stripe is a full copy
+    of its k data blocks (_hot_d* chunks); capacity_bytes bounds the total.
+    Writes to a cached stripe either invalidate the copy or update it in place
+    (write_policy "through"), so reads never see stale data.
+    A stripe is admitted only on a read miss, once it has been read `admit_reads`
+    times in a row without a write: copying a stripe that is about to be written
+    (and, under "invalidate", dropped again) costs more than the reads it serves.
+    """
+    def __init__(self, controller, node, capacity_bytes, policy="lru", write_policy="invalidate", admit_reads=4):
+        self.controller = controller
+        self.node = node
+        self.entry_bytes = BLOCKS_PER_STRIPE * BLOCK_SIZE
+        self.capacity_bytes = capacity_bytes
+        self.policy = CACHE_POLICIES[policy](max(1, capacity_bytes // self.entry_bytes))
+        self.write_policy = write_policy
+        self.admit_reads = admit_reads
+        self.read_streak = {}       # stripe_id -> reads since its last write
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.admissions = 0
+        self.invalidations = 0
+
+    def __contains__(self, stripe_id):
+        return stripe_id in self.policy
+
+    def lookup(self, stripe_id):
+        """Count a read against the cache; True if it can be served from the cache node."""
+        if stripe_id in self.policy and self.node.alive:
+            self.policy.touch(stripe_id)
+            self.hits += 1
+            return True
+        self.misses += 1
+        self.read_streak[stripe_id] = self.read_streak.get(stripe_id, 0) + 1
+        return False
+
+    def should_admit(self, stripe_id):
+        """True if a stripe that just missed has been read often enough since its last write."""
+        return stripe_id not in self.policy and self.read_streak.get(stripe_id, 0) >= self.admit_reads
+
+    def admit(self, stripe_id):
+        """Copy a stripe into the cache (evicting as needed). Returns the evicted stripe ids."""
+        if stripe_id in self.policy:
+            self.policy.touch(stripe_id)
+            return []
+        self.controller.relocate_stripe(stripe_id, self.node)
+        self.admissions += 1
+        evicted = self.policy.insert(stripe_id)
+        for victim in evicted:
+            self._drop(victim)
+            self.evictions += 1
+        return evicted
+
+    def on_write(self, stripe_id, blocks):
+        """Keep a cached copy coherent with a write of {data_index: block}."""
+        self.read_streak.pop(stripe_id, None)
+        if stripe_id not in self.policy:
+            return
+        if self.write_policy == "through" and self.node.alive:
+            try:
+                for idx, block in blocks.items():
+                    self.node.write_chunk(f"stripe{stripe_id}_hot_d{idx}", block)
+                return
+            except Exception:
+                pass    # could not update the copy: fall back to invalidation
+        self.invalidate(stripe_id)
+
+    def invalidate(self, stripe_id):
+        if stripe_id in self.policy:
+            self.policy.remove(stripe_id)
+            self._drop(stripe_id)
+            self.invalidations += 1
+
+    def _drop(self, stripe_id):
+        if self.controller.relocations.get(stripe_id) == self.node.id:
+            del self.controller.relocations[stripe_id]
+        for i in range(BLOCKS_PER_STRIPE):
+            chunk_id = f"stripe{stripe_id}_hot_d{i}"
+            self.node.delete_chunk(chunk_id)
+            self.controller.forget_chunk(chunk_id)
+
+    def reset(self, node=None):
+        """Forget every entry (e.g. the cache node failed); optionally move to a new node."""
+        for stripe_id in list(self.controller.relocations):
+            if self.controller.relocations[stripe_id] == self.node.id:
+                del self.controller.relocations[stripe_id]
+        self.policy = type(self.policy)(self.policy.capacity)
+        if node is not None:
+            self.node = node
+
+    @property
+    def occupancy_bytes(self):
+        return len(self.policy) * self.entry_bytes
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "admissions": self.admissions,
+            "invalidations": self.invalidations,
+            "occupancy_bytes": self.occupancy_bytes,
+            "capacity_bytes": self.capacity_bytes,
+        }
@@ -1,44 +1,124 @@
 # client.py
 import os
 import random
-import time
 from simulator.constants import BLOCK_SIZE, BLOCKS_PER_STRIPE
 import numpy as np
 
+OP_NAMES = ("read", "write")          # trace op codes: 0 = read, 1 = write
+TRACE_DTYPE = np.dtype([("op", "u1"), ("stripe", "<u4"), ("index", "u1")])
+
 def random_block(seed=None):
     # return BLOCK_SIZE bytes (pseudo-random)
     if seed is not None:
         random.seed(seed)
     return os.urandom(BLOCK_SIZE)
 
+def save_trace(path, ops, stripes, indices):
+    """Save a trace as a compact .npy of TRACE_DTYPE records (6 bytes/op)."""
+    trace = np.empty(len(ops), dtype=TRACE_DTYPE)
+    trace["op"] = ops
+    trace["stripe"] = stripes
+    trace["index"] = indices
+    np.save(path, trace)
+    return trace
+
+def load_trace(path):
+    return np.load(path, mmap_mode="r")
+
 class WorkloadGenerator:
     """
     Workload generator that yields (op, stripe_id, data_index, data_bytes).
     op: 'read' or 'write'
     Supports modes: random, seq, zipf (hotspot).
+    Ops are drawn in vectorized batches; payloads come from a fixed pool of
+    random blocks instead of fresh os.urandom() per op.
     """
-    def __init__(self, mode="zipf", stripes=1000, zipf_s=1.2, hot_fraction=0.1):
+    def __init__(self, mode="zipf", stripes=1000, zipf_s=1.2, hot_fraction=0.1,
+                 read_ratio=0.7, seed=None, batch_size=4096, pool_size=64):
         self.mode = mode
         self.stripes = stripes
         self.zipf_s = zipf_s
         self.hot_fraction = hot_fraction
+        self.read_ratio = read_ratio
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
         # precompute hot stripes
         self.hot_count = max(1, int(stripes * hot_fraction))
         self.hot_stripes = list(range(self.hot_count))
-        # Zipf generator (numpy)
+        # Zipf generator: CDF over ranks, sampled with searchsorted
         if self.mode == "zipf":
             ranks = np.arange(1, stripes+1)
             weights = 1 / np.power(ranks, self.zipf_s)
             self.p = weights / weights.sum()
+            self.cdf = np.cumsum(self.p)
+            self.cdf[-1] = 1.0
+        self.pool = [self.rng.bytes(BLOCK_SIZE) for _ in range(pool_size)]
+        self._seq_pos = 0           # next block for the sequential scan
+        self._batch = ([], [], [])
+        self._pos = 0
 
-    def next_op(self):
-        op = 'read' if random.random() < 0.7 else 'write'
+    def generate(self, n):
+        """Draw n ops at once. Returns (ops, stripes, indices) numpy arrays (op 1 = write)."""
+        ops = (self.rng.random(n) >= self.read_ratio).astype(np.uint8)
         if self.mode == "random":
-            stripe = random.randint(0, self.stripes - 1)
+            stripes = self.rng.integers(0, self.stripes, n)
+            indices = self.rng.integers(0, BLOCKS_PER_STRIPE, n)
         elif self.mode == "seq":
-            stripe = random.randint(0, self.stripes - 1)  # could be improved
+            # scan every block of every stripe in order, wrapping around
+            blocks = (self._seq_pos + np.arange(n)) % (self.stripes * BLOCKS_PER_STRIPE)
+            self._seq_pos = int(blocks[-1]) + 1 if n else self._seq_pos
+            stripes, indices = np.divmod(blocks, BLOCKS_PER_STRIPE)
         else:  # zipf
-            stripe = np.random.choice(self.stripes, p=self.p)
-        data_index = random.randint(0, BLOCKS_PER_STRIPE - 1)
-        data = random_block()
-        return op, int(stripe), int(data_index), data
+            stripes = np.searchsorted(self.cdf, self.rng.random(n), side="right")
+            indices = self.rng.integers(0, BLOCKS_PER_STRIPE, n)
+        return ops, stripes, indices
+
+    def payload(self, n=1):
+        """n random blocks from the payload pool, for writes that need data."""
+        picks = self.rng.integers(0, len(self.pool), n)
+        return [self.pool[i] for i in picks]
+
+    def next_op(self):
+        ops, stripes, indices = self._batch
+        if self._pos >= len(ops):
+            ops, stripes, indices = (a.tolist() for a in self.generate(self.batch_size))
+            self._batch = (ops, stripes, indices)
+            self._pos = 0
+        i = self._pos
+        self._pos += 1
+        data = self.pool[i % len(self.pool)]
+        return OP_NAMES[ops[i]], stripes[i], indices[i], data
+
+    def save_trace(self, path, n):
+        """Draw n ops and write them to `path` for later replay."""
+        return save_trace(path, *self.generate(n))
+
+class TraceWorkload:
+    """
+    Replays a saved trace with the same next_op() interface, reading the
+    memory-mapped records in batches. next_op() returns None at the end.
+    """
+    def __init__(self, path, seed=None, pool_size=64, batch_size=4096):
+        self.trace = load_trace(path)
+        self.stripes = int(self.trace["stripe"].max()) + 1 if len(self.trace) else 0
+        self.batch_size = batch_size
+        rng = np.random.default_rng(seed)
+        self.pool = [rng.bytes(BLOCK_SIZE) for _ in range(pool_size)]
+        self._start = 0             # trace offset of the current batch
+        self._batch = []
+        self._pos = 0
+
+    def payload(self, n=1):
+        return [self.pool[(self._pos + i) % len(self.pool)] for i in range(n)]
+
+    def next_op(self):
+        if self._pos >= len(self._batch):
+            self._start += len(self._batch)
+            self._batch = self.trace[self._start:self._start + self.batch_size].tolist()
+            self._pos = 0
+            if not self._batch:
+                return None
+        op, stripe, index = self._batch[self._pos]
+        data = self.pool[self._pos % len(self.pool)]
+        self._pos += 1
+        return OP_NAMES[op], stripe, index, data
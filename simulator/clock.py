@@ -0,0 +1,188 @@
+# clock.py
+import heapq
+import itertools
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from simulator.metrics import METRICS
+
+class SimClock:
+    """
+    Virtual clock for discrete-event simulation.
+    Time is in seconds (like time.time()) but only moves when a component
+    sleeps on it or when the event loop pops the next scheduled event, so
+    results depend on the seed only, never on host speed.
+    """
+    def __init__(self, start=0.0):
+        self.now = start
+        self.horizon = start            # time of the last popped event: nothing starts earlier
+        self._events = []               # heap of (time, seq, callback, args)
+        self._seq = itertools.count()   # tie-breaker: FIFO among equal timestamps
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        # the calling operation "waits": just move its time forward
+        if seconds > 0:
+            self.now += seconds
+
+    def advance_to(self, t):
+        if t > self.now:
+            self.now = t
+
+    def schedule(self, at, callback, *args):
+        """Run callback(*args) at simulated time `at`."""
+        heapq.heappush(self._events, (at, next(self._seq), callback, args))
+
+    def pending(self):
+        return len(self._events)
+
+    @contextmanager
+    def parallel(self):
+        """
+        Fan out work that proceeds concurrently in simulated time:
+
+            with clock.parallel() as par:
+                for node in nodes:
+                    with par.branch():
+                        node.write_chunk(...)
+
+        Every branch starts at the fork time; on exit the clock is at the
+        completion of the slowest branch.
+        """
+        fork = _Fork(self)
+        try:
+            yield fork
+        finally:
+            self.now = fork.end
+
+    def run(self, until=None):
+        """Pop events in timestamp order until the queue drains (or `until` is passed)."""
+        while self._events:
+            if until is not None and self._events[0][0] > until:
+                break
+            at, _, callback, args = heapq.heappop(self._events)
+            self.now = self.horizon = at
+            callback(*args)
+
+class _Fork:
+    def __init__(self, clock):
+        self.clock = clock
+        self.start = clock.now
+        self.end = clock.now
+
+    @contextmanager
+    def branch(self):
+        self.clock.now = self.start
+        try:
+            yield
+        finally:
+            self.end = max(self.end, self.clock.now)
+
+class Calendar:
+    """
+    Busy intervals of one server (a link, a device slot), kept sorted and disjoint.
+    Ops run atomically and out of virtual-time order, so a transfer issued at an
+    earlier time than one already reserved must still be able to use the idle gap
+    before it: fit() returns the first start >= t that leaves `duration` free.
+    Intervals that end before `floor` are forgotten (nothing starts before it).
+    """
+    MAX_INTERVALS = 4096
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.floor = 0.0
+
+    def prune(self, t):
+        # drop intervals no request can overlap any more (t: the clock's horizon)
+        i = bisect_right(self.ends, t)
+        if len(self.ends) - i > self.MAX_INTERVALS:
+            i = len(self.ends) - self.MAX_INTERVALS
+            t = max(t, self.ends[i - 1])    # forgotten busy time stays unavailable
+        if i:
+            del self.starts[:i], self.ends[:i]
+        self.floor = max(self.floor, t)
+
+    def fit(self, t, duration):
+        """Earliest start >= t at which [start, start + duration) is free."""
+        t = max(t, self.floor)
+        starts, ends = self.starts, self.ends
+        i = bisect_right(ends, t)
+        while i < len(starts) and starts[i] < t + duration:
+            t = max(t, ends[i])
+            i += 1
+        return t
+
+    def reserve(self, start, end):
+        # merges with overlapping or touching intervals
+        if end <= start:
+            return
+        starts, ends = self.starts, self.ends
+        i = bisect_left(ends, start)
+        j = bisect_right(starts, end, lo=i)
+        if i < j:
+            start = min(start, starts[i])
+            end = max(end, ends[j - 1])
+        starts[i:j] = [start]
+        ends[i:j] = [end]
+
+class SimResource:
+    """
+    A resource with `capacity` service slots in simulated time.
+    capacity=1 behaves like a lock; capacity=D models a device queue depth.
+    Each slot keeps its reservations as busy intervals (Calendar), so a holder
+    arriving at an earlier simulated time than a reservation already made starts
+    in the idle gap before it if the gap is long enough, instead of queueing
+    behind it. Holders that find every slot busy wait for the earliest fitting gap.
+    With a `name`, every wait (including zero waits) is recorded as that sim phase;
+    with `every` > 1 only one hold in `every` is (see metrics.SAMPLE_EVERY).
+
+    Callers that know their service time use fit() + claim(); hold(service) does
+    both around a block. Without `service`, hold() asks for a gap as long as the
+    longest hold seen so far (a block that runs longer is still recorded).
+    """
+    def __init__(self, clock, capacity=1, name=None, every=1):
+        self.clock = clock
+        self.capacity = capacity
+        self.name = name
+        self.every = every
+        self.stats = METRICS.phase(name, "sim", every) if name is not None else None
+        self.slots = [Calendar() for _ in range(capacity)]
+        self.longest = 0.0
+        self.wait_total = 0.0
+        self.holds = 0
+
+    def fit(self, t, duration):
+        """(start, slot): the earliest start >= t at which some slot is free for `duration`."""
+        best, slot = None, 0
+        for i, cal in enumerate(self.slots):
+            start = cal.fit(t, duration)
+            if best is None or start < best:
+                best, slot = start, i
+                if start == t:
+                    break
+        return best, slot
+
+    def claim(self, slot, start, end, requested):
+        """Reserve [start, end) on a slot for a holder that asked at `requested`."""
+        wait = start - requested
+        if wait > 0:
+            self.wait_total += wait
+        self.holds += 1
+        if self.stats is not None and METRICS.enabled and not self.holds % self.every:
+            self.stats.observe(max(wait, 0.0) * 1000.0)
+        self.longest = max(self.longest, end - start)
+        cal = self.slots[slot]
+        cal.prune(self.clock.horizon)
+        cal.reserve(start, end)
+
+    @contextmanager
+    def hold(self, service=None):
+        requested = self.clock.now
+        start, slot = self.fit(requested, self.longest if service is None else service)
+        self.clock.now = max(start, requested)
+        try:
+            yield
+        finally:
+            self.claim(slot, start, self.clock.now, requested)
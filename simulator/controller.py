@@ -1,45 +1,342 @@
 # controller.py
-import hashlib
-from simulator.constants import BLOCKS_PER_STRIPE, PARITY_BLOCKS, STRIPE_SIZE, BLOCK_SIZE
-import time
-import os
+import re
+from collections import defaultdict
+from simulator.constants import BLOCKS_PER_STRIPE, PARITY_BLOCKS, BLOCK_SIZE
+from simulator.parity import rs_encode, rs_reconstruct, rs_delta
+from simulator.clock import SimResource
+from simulator.rebuild import RebuildJob, MigrationJob
+from simulator.placement import make_placement, stable_order
+from simulator.journal import ControllerCrash
+
+# chunk names: stripe<id>_d<i> (data), stripe<id>_p<j> (parity), stripe<id>_hot_d<i> (cache copies)
+_CHUNK_RE = re.compile(r"stripe(\d+)_(hot_d|d|p)(\d+)$")
 
 class Controller:
     """
     Simple controller that maps stripe_id -> nodes.
-    Data layout: each stripe has k data chunks + r parity chunks placed across nodes
-    in round-robin fashion starting at stripe_id % N.
+    Data layout: each stripe has k data chunks + r parity chunks placed on k + r of the
+    member nodes by a placement engine (placement.py; default round-robin starting at
+    stripe_id % N). The placement of a stripe is recorded when it is first written
+    (or set explicitly, e.g. energy-aware placement) and only changes by migration.
     """
-    def __init__(self, nodes: list, network):
+    def __init__(self, nodes: list, network, placement="roundrobin"):
         self.nodes = nodes
         self.N = len(nodes)
+        # member slots (positions in self.nodes) that new placements may use; replaced on change
+        self.members = tuple(range(self.N))
         self.k = BLOCKS_PER_STRIPE
         self.r = PARITY_BLOCKS
         self.network = network
+        self.clock = network.clock
         # mapping for relocated hot stripes: stripe_id -> node_id (cache node index)
         self.relocations = {}
+        # per-stripe write locks (simulated time) so concurrent writers serialize per stripe
+        self.stripe_locks = {}
+        # chunk-location index, kept current on every write, relocation and rebuild:
+        # chunk_id -> node_id, and node_id -> {chunk_id: (stripe_id, chunk_index)}
+        # (chunk_index is 0..k-1 for data, k..k+r-1 for parity, None for hot-cache copies)
+        self.chunk_locations = {}
+        self.node_chunks = defaultdict(dict)
+        # optional HotStripeCache kept coherent on every write
+        self.cache = None
+        self.engine = make_placement(placement, BLOCKS_PER_STRIPE + PARITY_BLOCKS)
+        # recorded placements: stripe_id -> k + r node positions (indices into self.nodes)
+        self.placement = {}
+        # stripes written at least once (placement also holds set_placement() reservations)
+        self.written = set()
+        # optional IntentJournal: every stripe update is bracketed by begin/commit records
+        self.journal = None
+        # set to crash the controller in the middle of the next stripe update
+        self.crash_pending = False
+        # optional ParityDeferral (energy_manager.py): parity updates bound for sleeping
+        # low-power nodes are deferred; stale_parity holds the stripes whose parity lags
+        self.deferral = None
+        self.stale_parity = set()
+
+    def target_positions(self, stripe_id):
+        """Where the placement engine puts the stripe given the current members."""
+        target = tuple(self.engine.place(stripe_id, self.members))
+        current = self.placement.get(stripe_id)
+        return target if current is None else stable_order(target, current)
+
+    def stripe_positions(self, stripe_id):
+        positions = self.placement.get(stripe_id)
+        return positions if positions is not None else self.target_positions(stripe_id)
 
     def stripe_nodes(self, stripe_id):
-        start = stripe_id % self.N
-        chosen = [self.nodes[(start + i) % self.N] for i in range(self.k + self.r)]
+        chosen = [self.nodes[i] for i in self.stripe_positions(stripe_id)]
         return chosen[:self.k], chosen[self.k:]
 
+    def is_written(self, stripe_id):
+        # not derived from the location index: a failed node's entries are gone until rebuilt
+        return stripe_id in self.written
+
+    def _defers(self, stripe_id, positions):
+        # parity of this stripe update is deferred (flushed later by the ParityDeferral)
+        return self.deferral is not None and (stripe_id in self.stale_parity
+                                              or self.deferral.defers(positions[self.k:]))
+
+    def set_placement(self, stripe_id, positions):
+        """Record where a stripe that has not been written yet will live."""
+        if self.is_written(stripe_id):
+            raise RuntimeError(f"stripe {stripe_id} already written; use migrate_stripe")
+        self.placement[stripe_id] = self._check_positions(positions)
+
+    def _check_positions(self, positions):
+        positions = tuple(positions)
+        if len(positions) != self.k + self.r or len(set(positions)) != len(positions):
+            raise ValueError(f"placement needs {self.k + self.r} distinct nodes, got {positions}")
+        return positions
+
+    def chunk_name(self, stripe_id, chunk_index):
+        if chunk_index < self.k:
+            return f"stripe{stripe_id}_d{chunk_index}"
+        return f"stripe{stripe_id}_p{chunk_index - self.k}"
+
+    def _record(self, chunk_id, node, stripe_id, chunk_index):
+        old = self.chunk_locations.get(chunk_id)
+        if old is not None and old != node.id:
+            self.node_chunks[old].pop(chunk_id, None)
+        self.chunk_locations[chunk_id] = node.id
+        self.node_chunks[node.id][chunk_id] = (stripe_id, chunk_index)
+
+    def forget_chunk(self, chunk_id):
+        node_id = self.chunk_locations.pop(chunk_id, None)
+        if node_id is not None:
+            self.node_chunks[node_id].pop(chunk_id, None)
+
+    def stripe_lock(self, stripe_id):
+        lock = self.stripe_locks.get(stripe_id)
+        if lock is None:
+            lock = self.stripe_locks[stripe_id] = SimResource(self.clock, name="stripe_lock_wait")
+        return lock
+
     def write_stripe(self, stripe_id, data_blocks):
         # data_blocks: list of k bytes objects
+        positions = self.stripe_positions(stripe_id)
         data_nodes, parity_nodes = self.stripe_nodes(stripe_id)
-        # compute parity
-        from simulator.parity import xor_parity
-        parity = xor_parity(data_blocks)
-        # write data to nodes (peer-to-peer style: instruct nodes)
-        # We'll write data blocks to respective nodes then parity to first parity node
-        for idx, block in enumerate(data_blocks):
-            node = data_nodes[idx]
-            chunk_id = f"stripe{stripe_id}_d{idx}"
-            node.write_chunk(chunk_id, block)
-        # parity write
-        parity_node = parity_nodes[0]
-        parity_chunk_id = f"stripe{stripe_id}_p0"
-        parity_node.write_chunk(parity_chunk_id, parity)
+        # compute parity (p0 is XOR, p1.. are Reed-Solomon when r > 1)
+        parities = rs_encode(data_blocks, self.r)
+        # write data + parity chunks to their nodes in parallel (peer-to-peer style)
+        nodes = data_nodes + parity_nodes
+        if not all(n.alive for n in nodes):
+            # no degraded writes: refuse up front rather than leave data and parity out of sync
+            raise RuntimeError("Node is down")
+        with self.stripe_lock(stripe_id).hold():
+            self.placement[stripe_id] = positions
+            self.written.add(stripe_id)
+            if self._defers(stripe_id, positions):
+                self._write_chunks(stripe_id, nodes, dict(enumerate(data_blocks)))
+                self.deferral.note(stripe_id)
+            else:
+                self._write_chunks(stripe_id, nodes, dict(enumerate(list(data_blocks) + parities)))
+            if self.cache is not None:
+                self.cache.on_write(stripe_id, dict(enumerate(data_blocks)))
+
+    def write_blocks(self, stripe_id, start_index, blocks):
+        """
+        Write len(blocks) consecutive data blocks of a stripe starting at start_index,
+        choosing the cheapest way to keep parity current (counted in chunk transfers, m = len(blocks)):
+          - "stripe": full-stripe write (m == k, or the stripe was never written: untouched blocks are zero)
+          - "rmw":    read-modify-write, p' = p ^ m_ij * (old ^ new): read m + r, write m + r
+          - "rcw":    reconstruct-write, read the k - m untouched blocks, write m + r
+          - "defer":  parity deferred (see ParityDeferral): write the m blocks only
+        Returns (strategy, bytes_moved).
+        """
+        m = len(blocks)
+        if start_index < 0 or start_index + m > self.k:
+            raise ValueError(f"blocks {start_index}..{start_index + m - 1} outside stripe of k={self.k}")
+        if m == self.k or not self.is_written(stripe_id):
+            full = [bytes(BLOCK_SIZE)] * self.k
+            full[start_index:start_index + m] = blocks
+            self.write_stripe(stripe_id, full)
+            return "stripe", (self.k + self.r) * BLOCK_SIZE
+        try:
+            return self._write_partial(stripe_id, start_index, blocks)
+        except FileNotFoundError:
+            # a chunk we needed is missing (e.g. not rebuilt yet): decode the stripe, rewrite it whole
+            chunks = self.read_any_k(stripe_id)
+            lost = [i for i in range(self.k) if i not in chunks]
+            decoded = rs_reconstruct(chunks, self.k, self.r, lost) if lost else {}
+            full = [bytes(chunks[i]) if i in chunks else decoded[i] for i in range(self.k)]
+            full[start_index:start_index + m] = blocks
+            self.write_stripe(stripe_id, full)
+            return "stripe", sum(len(c) for c in chunks.values()) + (self.k + self.r) * BLOCK_SIZE
+
+    def _write_partial(self, stripe_id, start_index, blocks):
+        m = len(blocks)
+        data_nodes, parity_nodes = self.stripe_nodes(stripe_id)
+        nodes = data_nodes + parity_nodes
+        if not all(n.alive for n in nodes):
+            raise RuntimeError("Node is down")
+        touched = list(range(start_index, start_index + m))
+        if self._defers(stripe_id, self.stripe_positions(stripe_id)):
+            with self.stripe_lock(stripe_id).hold():
+                self._write_chunks(stripe_id, nodes, dict(zip(touched, blocks)))
+                self.deferral.note(stripe_id)
+                if self.cache is not None:
+                    self.cache.on_write(stripe_id, dict(zip(touched, blocks)))
+            return "defer", m * BLOCK_SIZE
+        if 2 * (m + self.r) <= self.k + self.r:
+            strategy, to_read = "rmw", touched + list(range(self.k, self.k + self.r))
+        else:
+            strategy, to_read = "rcw", [i for i in range(self.k) if i not in touched]
+        with self.stripe_lock(stripe_id).hold():
+            old = {}
+            with self.clock.parallel() as par:
+                for idx in to_read:
+                    with par.branch():
+                        old[idx] = nodes[idx].read_chunk(self.chunk_name(stripe_id, idx))
+            new = dict(zip(touched, blocks))
+            if strategy == "rmw":
+                parities = [old[self.k + j] for j in range(self.r)]
+                for idx in touched:
+                    parities = rs_delta(parities, idx, old[idx], new[idx], self.k)
+            else:
+                parities = rs_encode([new[i] if i in new else old[i] for i in range(self.k)], self.r)
+            # consume the old chunks before overwriting them (store reads may be views)
+            new.update((self.k + j, p) for j, p in enumerate(parities))
+            moved = sum(len(b) for b in old.values()) + sum(len(b) for b in new.values())
+            self._write_chunks(stripe_id, nodes, new)
+            if self.cache is not None:
+                self.cache.on_write(stripe_id, dict(zip(touched, blocks)))
+        return strategy, moved
+
+    def _write_chunks(self, stripe_id, nodes, blocks):
+        """
+        Write {chunk_index: block} of one stripe update in parallel, bracketed by an
+        intent record. If the update fails partway the intent stays open, so the
+        stripe is resynced on replay or by the scrubber. A pending crash tears the
+        update after its data chunks, before any parity lands (the write hole).
+        """
+        seq = self.journal.begin(stripe_id, list(blocks)) if self.journal is not None else None
+        crash = self.crash_pending
+        with self.clock.parallel() as par:
+            for idx, block in blocks.items():
+                if crash and idx >= self.k:
+                    continue
+                with par.branch():
+                    chunk_id = self.chunk_name(stripe_id, idx)
+                    nodes[idx].write_chunk(chunk_id, block)
+                    self._record(chunk_id, nodes[idx], stripe_id, idx)
+        if crash:
+            self.crash_pending = False
+            raise ControllerCrash(f"controller crashed while updating stripe {stripe_id}")
+        if seq is not None:
+            self.journal.commit(seq)
+
+    def scrub_stripe(self, stripe_id):
+        """
+        Recompute a stripe's parity from its data chunks and rewrite parity chunks
+        that do not match (data wins, as after a torn update). Returns (status,
+        bytes_moved) with status "clean", "repaired" or "unreadable" (a chunk or
+        node is unavailable; left to degraded reads / rebuild).
+        """
+        nodes = sum(self.stripe_nodes(stripe_id), [])
+        with self.stripe_lock(stripe_id).hold():
+            chunks = {}
+            with self.clock.parallel() as par:
+                for idx, node in enumerate(nodes):
+                    with par.branch():
+                        try:
+                            chunks[idx] = bytes(node.read_chunk(self.chunk_name(stripe_id, idx)))
+                        except Exception:
+                            pass
+            moved = sum(len(c) for c in chunks.values())
+            if any(i not in chunks for i in range(self.k)):
+                return "unreadable", moved
+            parities = rs_encode([chunks[i] for i in range(self.k)], self.r)
+            bad = {self.k + j: p for j, p in enumerate(parities) if chunks.get(self.k + j) != p}
+            if not all(nodes[i].alive for i in bad):
+                return "unreadable", moved
+            with self.clock.parallel() as par:
+                for idx, block in bad.items():
+                    with par.branch():
+                        chunk_id = self.chunk_name(stripe_id, idx)
+                        nodes[idx].write_chunk(chunk_id, block)
+                        self._record(chunk_id, nodes[idx], stripe_id, idx)
+                        moved += len(block)
+        self.stale_parity.discard(stripe_id)
+        if self.journal is not None:
+            self.journal.resolve(stripe_id)
+        return ("repaired" if bad else "clean"), moved
+
+    def resync_parity(self, stripe_ids):
+        """
+        Bring deferred parity up to date: for each stripe, read its k data chunks,
+        encode and write its parity chunks, all stripes in parallel (one burst per
+        parity node). Stripes that fail stay stale. Returns the bytes moved.
+        """
+        moved = 0
+        with self.clock.parallel() as par:
+            for stripe_id in stripe_ids:
+                with par.branch():
+                    try:
+                        moved += self._resync_parity(stripe_id)
+                    except ControllerCrash:
+                        raise
+                    except Exception:
+                        pass    # retried on the next flush (or by the scrubber)
+        return moved
+
+    def _resync_parity(self, stripe_id):
+        nodes = sum(self.stripe_nodes(stripe_id), [])
+        with self.stripe_lock(stripe_id).hold():
+            data = {}
+            with self.clock.parallel() as par:
+                for idx in range(self.k):
+                    with par.branch():
+                        data[idx] = bytes(nodes[idx].read_chunk(self.chunk_name(stripe_id, idx)))
+            parities = rs_encode([data[i] for i in range(self.k)], self.r)
+            self._write_chunks(stripe_id, nodes, {self.k + j: p for j, p in enumerate(parities)})
+        self.stale_parity.discard(stripe_id)
+        if self.journal is not None:
+            self.journal.resolve(stripe_id)
+        return self.k * BLOCK_SIZE + sum(len(p) for p in parities)
+
+    def scrub_order(self):
+        """Written stripes to scrub, stripes with open intents first."""
+        dirty = self.journal.dirty_stripes() if self.journal is not None else []
+        return dirty + sorted(set(self.placement) - set(dirty))
+
+    def replay_journal(self):
+        """
+        Startup recovery: resync the parity of every stripe with an open intent.
+        Returns {status: stripes}.
+        """
+        counts = defaultdict(int)
+        for stripe_id in self.journal.dirty_stripes():
+            status, _ = self.scrub_stripe(stripe_id)
+            counts[status] += 1
+        return dict(counts)
+
+    def recover_from_nodes(self):
+        """
+        Rebuild the chunk-location index and stripe placements by listing every
+        node's chunks (restart over existing node data). Cache copies are dropped.
+        Returns the number of stripes found.
+        """
+        position = {n.id: i for i, n in enumerate(self.nodes)}
+        found = defaultdict(dict)       # stripe_id -> {chunk_index: position}
+        for node in self.nodes:
+            for chunk_id in node.list_chunks():
+                m = _CHUNK_RE.match(chunk_id)
+                if m is None:
+                    continue
+                stripe_id, kind, i = int(m.group(1)), m.group(2), int(m.group(3))
+                if kind == "hot_d":
+                    node.delete_chunk(chunk_id)
+                    continue
+                idx = i if kind == "d" else self.k + i
+                self._record(chunk_id, node, stripe_id, idx)
+                found[stripe_id][idx] = position[node.id]
+        for stripe_id, held in found.items():
+            # chunks never written (e.g. parity torn off a new stripe) go to unused target nodes
+            spare = iter([p for p in self.target_positions(stripe_id) if p not in held.values()])
+            self.placement[stripe_id] = tuple(held[i] if i in held else next(spare)
+                                              for i in range(self.k + self.r))
+            self.written.add(stripe_id)
+        return len(found)
 
     def read_block(self, stripe_id, data_index):
         # read a single data block
@@ -48,39 +345,193 @@ class Controller:
         chunk_id = f"stripe{stripe_id}_d{data_index}"
         return node.read_chunk(chunk_id)
 
-    def degrade_and_recover(self, failed_node_index, replacement_node):
+    def degraded_read(self, stripe_id, data_index):
+        """
+        Serve a read whose data chunk is unavailable (node down or chunk not yet
+        rebuilt) by decoding it from k surviving chunks, read in parallel.
+        """
+        chunks = self.read_any_k(stripe_id, exclude=(data_index,))
+        return rs_reconstruct(chunks, self.k, self.r, [data_index])[data_index]
+
+    def relocate_stripe(self, stripe_id, cache_node):
+        """
+        Copy a stripe's data chunks to cache_node as _hot_d* copies (in parallel) and
+        route reads there. If any copy fails, the copies already written are deleted.
+        """
+        data_nodes, parity_nodes = self.stripe_nodes(stripe_id)
+        written = []
+        failed = None
+        with self.clock.parallel() as par:
+            for i, n in enumerate(data_nodes):
+                with par.branch():
+                    chunk_id = f"stripe{stripe_id}_hot_d{i}"
+                    try:
+                        cache_node.write_chunk(chunk_id, n.read_chunk(f"stripe{stripe_id}_d{i}"))
+                        written.append(chunk_id)
+                    except Exception as e:
+                        failed = e
+        if failed is not None:
+            for chunk_id in written:
+                cache_node.delete_chunk(chunk_id)
+            raise failed
+        for chunk_id in written:
+            self._record(chunk_id, cache_node, stripe_id, None)
+        self.relocations[stripe_id] = cache_node.id
+
+    def migrate_stripe(self, stripe_id, positions):
+        """
+        Move a written stripe to new node positions. Only chunks whose node changes
+        move: each is copied from its current node (or decoded from k survivors if
+        that node is down), written to its new node in parallel, and then deleted
+        from the old one. Deferred (stale) parity is not copied: it is re-encoded
+        from the data chunks, which also brings it up to date if all of it moves.
+        Returns the bytes moved (reads + writes).
+        """
+        positions = self._check_positions(positions)
+        current = self.stripe_positions(stripe_id)
+        moves = [i for i in range(self.k + self.r) if current[i] != positions[i]]
+        if not all(self.nodes[positions[i]].alive for i in moves):
+            raise RuntimeError("Node is down")
+        parity = range(self.k, self.k + self.r)
+        stale = stripe_id in self.stale_parity and any(i in parity for i in moves)
+        to_read = sorted(set(range(self.k)) | {i for i in moves if i < self.k}) if stale else moves
+        with self.stripe_lock(stripe_id).hold():
+            blocks = {}
+            with self.clock.parallel() as par:
+                for idx in to_read:
+                    with par.branch():
+                        try:
+                            blocks[idx] = bytes(self.nodes[current[idx]].read_chunk(self.chunk_name(stripe_id, idx)))
+                        except Exception:
+                            pass    # decoded below
+            moved = sum(len(b) for b in blocks.values())
+            missing = [i for i in to_read if i not in blocks]
+            if missing:
+                chunks = self.read_any_k(stripe_id, exclude=missing)
+                blocks.update(rs_reconstruct(chunks, self.k, self.r, missing))
+                moved += sum(len(c) for c in chunks.values())
+            if stale:
+                blocks.update(zip(parity, rs_encode([blocks[i] for i in range(self.k)], self.r)))
+            with self.clock.parallel() as par:
+                for idx in moves:
+                    with par.branch():
+                        chunk_id = self.chunk_name(stripe_id, idx)
+                        self.nodes[positions[idx]].write_chunk(chunk_id, blocks[idx])
+                        self._record(chunk_id, self.nodes[positions[idx]], stripe_id, idx)
+                        moved += len(blocks[idx])
+            for idx in moves:
+                self.nodes[current[idx]].delete_chunk(self.chunk_name(stripe_id, idx))
+            self.placement[stripe_id] = positions
+        if stale and all(i in moves for i in parity):
+            self.stale_parity.discard(stripe_id)
+            if self.journal is not None:
+                self.journal.resolve(stripe_id)
+        return moved
+
+    def rebalance_stripe(self, stripe_id):
+        """Migrate a stripe to its engine target if that changed; returns the bytes moved (0 if none)."""
+        target = self.target_positions(stripe_id)
+        if self.placement.get(stripe_id, target) == target:
+            return 0
+        return self.migrate_stripe(stripe_id, target)
+
+    def rebalance(self, workers=4, bandwidth_mbps=None):
+        """Start a background MigrationJob for every written stripe whose target changed."""
+        work = [s for s, pos in sorted(self.placement.items()) if pos != self.target_positions(s)]
+        return MigrationJob(self, work, workers, bandwidth_mbps).start()
+
+    def add_node(self, node, workers=4, bandwidth_mbps=None):
+        """Join a node: new placements may use it and affected stripes migrate in the background."""
+        self.nodes.append(node)
+        self.members = self.members + (len(self.nodes) - 1,)
+        return self.rebalance(workers, bandwidth_mbps)
+
+    def remove_node(self, position, workers=4, bandwidth_mbps=None):
+        """
+        Drain the node at `position`: it leaves the membership and its stripes migrate
+        off in the background; it keeps serving its chunks until they have moved.
+        """
+        self.members = tuple(m for m in self.members if m != position)
+        return self.rebalance(workers, bandwidth_mbps)
+
+    def read_any_k(self, stripe_id, exclude=()):
+        """
+        Read k surviving chunks of a stripe, in parallel, skipping chunk indices in
+        `exclude`. Chunks that fail to read are replaced by the next candidates.
+        Returns {chunk_index: bytes}.
         """
-        Simulate degraded read & reconstruct missing chunks and write to replacement node.
-        This is simplified to reconstruct all missing chunks that belonged to failed_node.
+        data_nodes, parity_nodes = self.stripe_nodes(stripe_id)
+        if stripe_id in self.stale_parity:
+            exclude = tuple(exclude) + tuple(range(self.k, self.k + self.r))     # deferred, out of date
+        candidates = [(idx, n) for idx, n in enumerate(data_nodes + parity_nodes) if idx not in exclude]
+        chunks = {}
+        while len(chunks) < self.k and candidates:
+            need = self.k - len(chunks)
+            batch, candidates = candidates[:need], candidates[need:]
+            with self.clock.parallel() as par:
+                for idx, node in batch:
+                    with par.branch():
+                        try:
+                            chunks[idx] = node.read_chunk(self.chunk_name(stripe_id, idx))
+                        except Exception:
+                            # tolerate up to r missing chunks
+                            pass
+        if len(chunks) < self.k:
+            raise RuntimeError(f"Insufficient blocks for recovery with r={self.r}")
+        return chunks
+
+    def rebuild_chunk(self, stripe_id, chunk_index, replacement_node, sources=None):
+        """
+        Reconstruct one data/parity chunk onto replacement_node.
+        Returns the bytes moved (reads + write), or 0 if the chunk is already there.
+        `sources` (a Counter) counts the chunks read per node position.
+        """
+        chunk_id = self.chunk_name(stripe_id, chunk_index)
+        if self.chunk_locations.get(chunk_id) == replacement_node.id:
+            return 0        # rewritten by a foreground write since the failure
+        with self.stripe_lock(stripe_id).hold():
+            chunks = self.read_any_k(stripe_id, exclude=(chunk_index,))
+            rebuilt = rs_reconstruct(chunks, self.k, self.r, [chunk_index])[chunk_index]
+            replacement_node.write_chunk(chunk_id, rebuilt)
+            self._record(chunk_id, replacement_node, stripe_id, chunk_index)
+        if sources is not None:
+            positions = self.stripe_positions(stripe_id)
+            sources.update(positions[idx] for idx in chunks)
+        return sum(len(c) for c in chunks.values()) + len(rebuilt)
+
+    def degrade_and_recover(self, failed_node_index, replacement_node, workers=4, bandwidth_mbps=None):
+        """
+        Replace a failed node and rebuild everything it held.
+        The replacement takes the failed node's position in the layout right away;
+        the chunks listed for the failed node in the location index are then
+        reconstructed onto it by a RebuildJob running on the simulation clock.
+        Hot-cache copies on the failed node are dropped, not rebuilt.
+        Returns the started RebuildJob (see RebuildJob.stats()).
         """
         failed_node = self.nodes[failed_node_index]
-        # find chunks belonging to failed node by scanning stripes (small search)
-        # For simplicity, we scan all stripe ids up to some bound (user chooses)
-        # In practice we'd maintain metadata—we'll reconstruct a configured range.
-        # Not implemented here: caller will reconstruct specific stripe(s) by invoking recovery_stripe.
-        raise NotImplementedError("Use recovery_stripe for reconstructing specific stripes")
+        failed_node.fail()
+        self.nodes[failed_node_index] = replacement_node
+        held = self.node_chunks.pop(failed_node.id, {})
+        work = []
+        for chunk_id, (stripe_id, chunk_index) in held.items():
+            del self.chunk_locations[chunk_id]
+            if chunk_index is None:
+                if self.relocations.get(stripe_id) == failed_node.id:
+                    del self.relocations[stripe_id]
+            else:
+                work.append((stripe_id, chunk_index))
+        work.sort()
+        if self.cache is not None and self.cache.node is failed_node:
+            self.cache.reset(replacement_node)
+        return RebuildJob(self, work, replacement_node, workers, bandwidth_mbps).start()
 
     def recovery_stripe(self, stripe_id, missing_index, replacement_node):
-        # missing_index: index in [0..k-1] of missing data chunk
-        # read other data blocks and parity, reconstruct via XOR and write to replacement
-        data_nodes, parity_nodes = self.stripe_nodes(stripe_id)
-        blocks = []
-        present_indices = []
-        for idx, node in enumerate(data_nodes):
-            if idx == missing_index:
-                continue
-            try:
-                blocks.append(node.read_chunk(f"stripe{stripe_id}_d{idx}"))
-                present_indices.append(idx)
-            except Exception:
-                # if another missing, reconstruct not possible in single parity case
-                raise RuntimeError("Insufficient blocks for single parity recovery")
-        # read parity
-        parity = parity_nodes[0].read_chunk(f"stripe{stripe_id}_p0")
-        # reconstruct = XOR of parity + other data blocks
-        from simulator.parity import xor_parity
-        combined = xor_parity(blocks + [parity])
+        # missing_index: index in [0..k+r-1] of the missing data/parity chunk
+        # read any k surviving chunks, reconstruct and write to replacement
+        chunks = self.read_any_k(stripe_id, exclude=(missing_index,))
+        combined = rs_reconstruct(chunks, self.k, self.r, [missing_index])[missing_index]
         # write reconstructed into replacement_node
-        chunk_id = f"stripe{stripe_id}_d{missing_index}"
+        chunk_id = self.chunk_name(stripe_id, missing_index)
         replacement_node.write_chunk(chunk_id, combined)
+        self._record(chunk_id, replacement_node, stripe_id, missing_index)
         return True
@@ -1,12 +1,120 @@
 # energy_manager.py
+from bisect import bisect_right
+from simulator.clock import Calendar
+from simulator.constants import PARITY_BLOCKS
+from simulator.metrics import METRICS
+
+class PowerProfile:
+    """
+    Power model of one node class.
+    Watts per state (active / idle / standby), energy per byte moved, and the
+    spin-down behaviour: after `spin_down_after` idle seconds the node drops to
+    standby (None = never); the next I/O pays `wake_s` latency and `wake_j` joules.
+    """
+    def __init__(self, active_w, idle_w, standby_w, joules_per_byte, spin_down_after=None, wake_s=0.0, wake_j=0.0):
+        self.active_w = active_w
+        self.idle_w = idle_w
+        self.standby_w = standby_w
+        self.joules_per_byte = joules_per_byte
+        self.spin_down_after = spin_down_after
+        self.wake_s = wake_s
+        self.wake_j = wake_j
+
+# fast node that stays spun up vs. a low-power node that sleeps when idle
+PERFORMANCE_PROFILE = PowerProfile(active_w=10.0, idle_w=6.0, standby_w=6.0, joules_per_byte=10e-9)
+LOW_POWER_PROFILE = PowerProfile(active_w=6.0, idle_w=3.0, standby_w=0.5, joules_per_byte=5e-9,
+                                 spin_down_after=0.1, wake_s=0.01, wake_j=0.5)
+
+class NodePower:
+    """
+    Per-node power state, accounted lazily from I/O timestamps on the simulation clock.
+    Ops run out of virtual-time order, so an I/O can land in an idle gap before I/O
+    already seen: busy time is kept as merged intervals (a Calendar) and charged,
+    with the idle/standby gaps between them, once the clock's horizon has passed.
+    """
+    def __init__(self, profile, now=0.0, clock=None):
+        self.profile = profile
+        self.clock = clock
+        self.busy = Calendar()      # busy intervals not charged yet
+        self.last_io_end = now      # end of the last charged interval: idle from here on
+        self.joules = 0.0
+        self.active_s = 0.0
+        self.idle_s = 0.0
+        self.standby_s = 0.0
+        self.wakeups = 0
+        self.bytes = 0
+
+    def _idle_until(self, t):
+        """Charge the idle gap up to t; returns True if the node had spun down."""
+        gap = t - self.last_io_end
+        if gap <= 0:
+            return False
+        pr = self.profile
+        if pr.spin_down_after is not None and gap > pr.spin_down_after:
+            self.idle_s += pr.spin_down_after
+            self.standby_s += gap - pr.spin_down_after
+            self.joules += pr.idle_w * pr.spin_down_after + pr.standby_w * (gap - pr.spin_down_after)
+            self.last_io_end = t
+            return True
+        self.idle_s += gap
+        self.joules += pr.idle_w * gap
+        self.last_io_end = t
+        return False
+
+    def _settle(self, t):
+        # charge the busy intervals ending by t and the gaps before them
+        busy, pr = self.busy, self.profile
+        i = bisect_right(busy.ends, t)
+        for start, end in zip(busy.starts[:i], busy.ends[:i]):
+            if self._idle_until(start):
+                self.wakeups += 1
+                self.joules += pr.wake_j
+            self.active_s += end - start
+            self.joules += pr.active_w * (end - start)
+            self.last_io_end = end
+        del busy.starts[:i], busy.ends[:i]
+
+    def wake_delay(self, t):
+        """The wake-up delay an I/O starting at t would pay (no state change)."""
+        sd = self.profile.spin_down_after
+        if sd is None:
+            return 0.0
+        i = bisect_right(self.busy.starts, t)
+        last = self.busy.ends[i - 1] if i else self.last_io_end
+        return self.profile.wake_s if t - last > sd else 0.0
+
+    def end_io(self, t_start, t_end, nbytes):
+        """Record an I/O busy over [t_start, t_end) (wake-up included)."""
+        self.bytes += nbytes
+        self.joules += self.profile.joules_per_byte * nbytes
+        self.busy.reserve(t_start, t_end)
+        if self.clock is not None:
+            self._settle(self.clock.horizon)    # nothing can start before the horizon
+
+    def finish(self, t_end):
+        """Charge everything recorded, then idle/standby time up to t_end."""
+        self._settle(float("inf"))
+        self._idle_until(t_end)
+
 class EnergyManager:
     """
     Energy-aware placement: we mark some nodes as 'low_power' where cold data should be stored.
     This is a simple policy interface used by the controller to decide where to place cold stripes.
+    It also owns the per-node power model: attach() hooks every node so each chunk
+    I/O is charged (and pays wake-up latency when it hits a spun-down node).
     """
-    def __init__(self, nodes, low_power_node_ids=None):
+    def __init__(self, nodes, low_power_node_ids=None, performance_profile=PERFORMANCE_PROFILE,
+                 low_power_profile=LOW_POWER_PROFILE):
         self.nodes = nodes
         self.low_power_node_ids = set(low_power_node_ids or [])
+        self.performance_profile = performance_profile
+        self.low_power_profile = low_power_profile
+        self.power = {}             # node_id -> NodePower
+
+    def attach(self, node, now=0.0):
+        profile = self.low_power_profile if node.id in self.low_power_node_ids else self.performance_profile
+        self.power[node.id] = NodePower(profile, now, node.clock)
+        node.energy = self.power[node.id]
 
     def choose_cold_node(self, stripe_id):
         """Return a low-power node for cold stripe storage (round-robin)."""
@@ -21,3 +129,112 @@ class EnergyManager:
             if n.id == pick:
                 return n
         return self.nodes[0]
+
+    def place(self, stripe_id, hot, width, parity=PARITY_BLOCKS):
+        """
+        Node positions (indices into nodes) for a stripe of `width` chunks, the last
+        `parity` of them parity. Low-power nodes only take trailing positions, and
+        only as many as needed: none for a hot stripe (unless there are fewer than
+        `width` performance nodes), the parity positions for a cold one (more only if
+        the performance nodes cannot hold its data). Cold stripes use the first
+        low-power nodes only, so the others get no I/O at all and stay in standby;
+        with a ParityDeferral, the parity writes to those few are batched too.
+        Performance positions are rotated by stripe_id to spread load.
+        """
+        low = [i for i, n in enumerate(self.nodes) if n.id in self.low_power_node_ids]
+        perf = [i for i, n in enumerate(self.nodes) if n.id not in self.low_power_node_ids]
+        if width > len(low) + len(perf):
+            raise ValueError(f"stripe width {width} exceeds {len(low) + len(perf)} nodes")
+        n_low = max(0, width - len(perf))
+        if not hot:
+            n_low = min(len(low), max(n_low, parity))
+        perf = perf[stripe_id % len(perf):] + perf[:stripe_id % len(perf)] if perf else perf
+        return perf[:width - n_low] + low[:n_low]
+
+    def is_hot_placement(self, positions):
+        """True if a placement avoids low-power nodes as far as the cluster allows."""
+        low = sum(1 for i in positions if self.nodes[i].id in self.low_power_node_ids)
+        perf_nodes = len(self.nodes) - len(self.low_power_node_ids)
+        return low <= max(0, len(positions) - perf_nodes)
+
+    def finish(self, t_end):
+        """Charge idle/standby time up to the end of the run."""
+        for p in self.power.values():
+            p.finish(t_end)
+
+    def report(self):
+        """{node_id: NodePower} plus the total joules."""
+        return self.power, sum(p.joules for p in self.power.values())
+
+class ParityDeferral:
+    """
+    I/O grouping for the cold tier. A stripe update whose parity lives on a
+    low-power node writes its data chunks only; the stripe's parity is marked
+    stale (controller.stale_parity, plus an open journal intent so a crash
+    resyncs it) and later stripe updates skip parity as well. Stale stripes are
+    flushed together (Controller.resync_parity) once `batch` have piled up or
+    `max_delay_s` after the first, so each low-power node wakes once per batch
+    instead of once per write and can sit in standby in between.
+    Until its flush a stale stripe has no parity protection: losing a data chunk
+    then loses data (degraded reads and rebuilds do not use stale parity).
+    """
+    def __init__(self, controller, node_ids, batch=64, max_delay_s=1.0):
+        self.controller = controller
+        self.clock = controller.clock
+        self.node_ids = set(node_ids)
+        self.batch = batch
+        self.max_delay_s = max_delay_s
+        self.flushes = 0
+        self.deferred_writes = 0
+        self.flushed_stripes = 0
+        self.bytes_moved = 0
+        self._flush_at = None       # time of the scheduled flush, if any
+
+    def defers(self, parity_positions):
+        nodes = self.controller.nodes
+        return any(nodes[i].id in self.node_ids for i in parity_positions)
+
+    def note(self, stripe_id):
+        """Record a deferred stripe update (called by the controller)."""
+        c = self.controller
+        self.deferred_writes += 1
+        if stripe_id not in c.stale_parity:
+            c.stale_parity.add(stripe_id)
+            if c.journal is not None:
+                c.journal.begin(stripe_id, range(c.k, c.k + c.r))     # committed by the resync
+        at = self.clock.now if len(c.stale_parity) >= self.batch else self.clock.now + self.max_delay_s
+        if self._flush_at is None or at < self._flush_at:
+            self._flush_at = at
+            self.clock.schedule(at, self._flush_event, at)
+
+    def _flush_event(self, at):
+        if self._flush_at == at:
+            self.flush()
+
+    def flush(self, retry=True):
+        """
+        Resync every stale stripe now; returns the number of stripes flushed.
+        Stripes that cannot be resynced (a node is down, a data chunk is lost)
+        are retried max_delay_s later, unless retry is False (final drain).
+        """
+        self._flush_at = None
+        c = self.controller
+        stripes = sorted(c.stale_parity)
+        if not stripes:
+            return 0
+        t0 = self.clock.now
+        self.bytes_moved += c.resync_parity(stripes)
+        METRICS.sim("parity_flush", self.clock.now - t0)
+        flushed = len(stripes) - len(c.stale_parity)
+        self.flushes += 1
+        self.flushed_stripes += flushed
+        if c.stale_parity and retry:
+            # could not be flushed (e.g. a node is down): retry later
+            self._flush_at = self.clock.now + self.max_delay_s
+            self.clock.schedule(self._flush_at, self._flush_event, self._flush_at)
+        return flushed
+
+    def stats(self):
+        return {"deferred_writes": self.deferred_writes, "flushes": self.flushes,
+                "flushed_stripes": self.flushed_stripes, "stale_stripes": len(self.controller.stale_parity),
+                "bytes_moved": self.bytes_moved}
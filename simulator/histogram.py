@@ -0,0 +1,76 @@
+# histogram.py
+import math
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram (HDR-style). Bucket i >= 1 covers
+    [lo * g^(i-1), lo * g^i) with g = 1 + precision, so any quantile is reported
+    within `precision` relative error; bucket 0 holds values below lo (e.g. 0).
+    Memory is fixed by (lo, hi, precision), not by the number of values, and two
+    histograms with the same layout merge by adding their counts.
+    numpy is imported on first use, so importing this module stays cheap.
+    """
+    def __init__(self, lo=1e-3, hi=1e6, precision=0.01):
+        import numpy as np
+        self.lo = lo
+        self.hi = hi
+        self.precision = precision
+        self._log_g = math.log1p(precision)
+        self.nbuckets = int(math.ceil(math.log(hi / lo) / self._log_g)) + 1
+        self.counts = np.zeros(self.nbuckets + 1, dtype=np.int64)
+        self.total = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values):
+        """Add an array of latencies (NaNs are ignored)."""
+        import numpy as np
+        v = np.asarray(values, dtype=np.float64)
+        v = v[~np.isnan(v)]
+        if not len(v):
+            return
+        idx = np.zeros(len(v), dtype=np.int64)
+        pos = v >= self.lo
+        idx[pos] = np.minimum(np.floor(np.log(v[pos] / self.lo) / self._log_g).astype(np.int64) + 1,
+                              self.nbuckets)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        self.total += len(v)
+        self.sum += float(v.sum())
+        self.min = min(self.min, float(v.min()))
+        self.max = max(self.max, float(v.max()))
+
+    def merge(self, other):
+        if (other.lo, other.hi, other.precision) != (self.lo, self.hi, self.precision):
+            raise ValueError("cannot merge histograms with different bucket layouts")
+        self.counts += other.counts
+        self.total += other.total
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _values(self, idx):
+        # representative value of each bucket (its geometric midpoint), clamped to the seen range
+        import numpy as np
+        idx = np.asarray(idx)
+        mid = self.lo * np.exp((idx - 0.5) * self._log_g)
+        mid = np.where(idx == 0, 0.0, mid)
+        return np.clip(mid, self.min, self.max)
+
+    @property
+    def mean(self):
+        return self.sum / self.total if self.total else float("nan")
+
+    def quantile(self, q):
+        import numpy as np
+        if not self.total:
+            return float("nan")
+        rank = max(1, int(math.ceil(q * self.total)))
+        return float(self._values(np.searchsorted(np.cumsum(self.counts), rank)))
+
+    def cdf(self):
+        """(values, cumulative fraction) over the non-empty buckets, for plotting."""
+        import numpy as np
+        idx = np.nonzero(self.counts)[0]
+        return self._values(idx), np.cumsum(self.counts[idx]) / max(self.total, 1)
@@ -0,0 +1,101 @@
+# journal.py
+import os
+from simulator.metrics import METRICS
+
+JOURNAL = METRICS.phase("journal", "sim")
+
+class ControllerCrash(Exception):
+    """Injected controller crash (Controller.crash_pending): tears the stripe update in flight."""
+
+class IntentJournal:
+    """
+    Write-ahead intent log for stripe updates (closes the RAID write hole).
+    Before a stripe update sends any chunk, begin() appends "B <seq> <stripe> <indices>";
+    once every chunk has landed, commit() appends "C <seq>". An intent without a
+    commit marks a stripe whose data and parity may disagree. Reopening the journal
+    (startup) loads those into `open` for Controller.replay_journal().
+
+    Each begin() costs `latency_ms` of simulated time (an NVRAM-class log device);
+    commits are not waited for. sync=True also fsyncs every record on the host
+    (not needed to survive a simulator process crash). The file is compacted down
+    to the open intents every `compact_every` records. With path None the journal
+    is kept in memory only (no replay across processes).
+    """
+    def __init__(self, path, clock=None, latency_ms=0.01, sync=False, compact_every=100_000):
+        self.path = path
+        self.clock = clock
+        self.latency_ms = latency_ms
+        self.sync = sync
+        self.compact_every = compact_every
+        self.open = {}          # seq -> (stripe_id, chunk indices)
+        self._seq = 0
+        self.fd = None
+        if path is not None:
+            if os.path.exists(path):
+                self._load()
+            self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self.records = len(self.open)
+
+    def _load(self):
+        with open(self.path) as f:
+            for line in f:
+                parts = line.split()
+                if not line.endswith("\n") or not parts:
+                    continue    # torn last record: its update never started
+                if parts[0] == "B" and len(parts) == 4:
+                    seq = int(parts[1])
+                    self.open[seq] = (int(parts[2]), tuple(int(i) for i in parts[3].split(",")))
+                elif parts[0] == "C" and len(parts) == 2:
+                    seq = int(parts[1])
+                    self.open.pop(seq, None)
+                else:
+                    continue
+                self._seq = max(self._seq, seq)
+
+    def _append(self, record):
+        if self.fd is None:
+            return
+        os.write(self.fd, record.encode())
+        if self.sync:
+            os.fsync(self.fd)
+        self.records += 1
+        if self.records >= self.compact_every:
+            self.compact()
+
+    def begin(self, stripe_id, indices):
+        self._seq += 1
+        self.open[self._seq] = (stripe_id, tuple(indices))
+        self._append(f"B {self._seq} {stripe_id} {','.join(map(str, indices))}\n")
+        if self.clock is not None and self.latency_ms:
+            self.clock.sleep(self.latency_ms / 1000.0)
+            if METRICS.enabled:
+                JOURNAL.observe(self.latency_ms)
+        return self._seq
+
+    def commit(self, seq):
+        if self.open.pop(seq, None) is not None:
+            self._append(f"C {seq}\n")
+
+    def resolve(self, stripe_id):
+        """Close every open intent of a stripe whose parity is known to be consistent again."""
+        for seq in [s for s, (stripe, _) in self.open.items() if stripe == stripe_id]:
+            self.commit(seq)
+
+    def dirty_stripes(self):
+        return sorted({stripe for stripe, _ in self.open.values()})
+
+    def compact(self):
+        # rewrite the file with only the open intents, then swap it in atomically
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            for seq, (stripe_id, indices) in sorted(self.open.items()):
+                f.write(f"B {seq} {stripe_id} {','.join(map(str, indices))}\n")
+        os.close(self.fd)
+        os.replace(tmp, self.path)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self.records = len(self.open)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
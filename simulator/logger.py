@@ -0,0 +1,147 @@
+# logger.py
+import csv
+import os
+
+LOG_COLUMNS = ["time_ms", "mode", "op", "latency_ms", "bytes", "stripe", "node_id", "extra"]
+LOG_FORMATS = ["csv", "parquet", "npy"]
+
+class ResultLogger:
+    """
+    Buffered result logger: owns one open output, keeps rows in memory and
+    writes them out in batches of `batch_size`.
+    latency_ms=None marks a failed op (written as "ERR" in CSV, NaN/null otherwise).
+    """
+    def __init__(self, path, batch_size=8192):
+        self.path = path
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
+
+    def log(self, time_ms, mode, op, latency_ms, bytes_len, stripe, node_id, extra=""):
+        self.rows.append((time_ms, mode, op, latency_ms, bytes_len, stripe, node_id, extra))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self._write(self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, rows):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+class CsvResultLogger(ResultLogger):
+    def __init__(self, path, batch_size=8192):
+        super().__init__(path, batch_size)
+        self.f = open(path, "w", newline='')
+        self.writer = csv.writer(self.f)
+        self.writer.writerow(LOG_COLUMNS)
+
+    def _write(self, rows):
+        self.writer.writerows(
+            (t, mode, op, "ERR" if lat is None else f"{lat:.3f}", b, s, n, extra)
+            for t, mode, op, lat, b, s, n, extra in rows)
+
+    def _close(self):
+        self.f.close()
+
+class ParquetResultLogger(ResultLogger):
+    """One Parquet row group per batch (requires pyarrow)."""
+    def __init__(self, path, batch_size=65536):
+        super().__init__(path, batch_size)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("--log-format parquet requires pyarrow (pip install pyarrow)") from e
+        self.pa = pa
+        self.schema = pa.schema([
+            ("time_ms", pa.int64()), ("mode", pa.string()), ("op", pa.string()),
+            ("latency_ms", pa.float64()), ("bytes", pa.int64()), ("stripe", pa.int64()),
+            ("node_id", pa.int32()), ("extra", pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def _write(self, rows):
+        columns = [list(col) for col in zip(*rows)]
+        self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+
+    def _close(self):
+        self.writer.close()
+
+# fixed-width records so the file can be appended to and later np.load(..., mmap_mode="r")'d
+NPY_FIELDS = [
+    ("time_ms", "<i8"), ("mode", "S24"), ("op", "S16"), ("latency_ms", "<f8"),
+    ("bytes", "<i8"), ("stripe", "<i8"), ("node_id", "<i4"), ("extra", "S48"),
+]
+_NPY_HEADER_LEN = 256
+
+def _npy_header(dtype, count):
+    import numpy as np
+    header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (count,)})
+    # magic(6) + version(2) + header length(2) + header, space padded, newline terminated
+    header = header.ljust(_NPY_HEADER_LEN - 10 - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+class NpyResultLogger(ResultLogger):
+    """
+    Binary log: a standard .npy file of NPY_FIELDS records. Rows are streamed in
+    batches and the header's row count is patched on close.
+    """
+    def __init__(self, path, batch_size=65536):
+        super().__init__(path, batch_size)
+        import numpy as np
+        self.np = np
+        self.dtype = np.dtype(NPY_FIELDS)
+        self.f = open(path, "wb")
+        self.f.write(_npy_header(self.dtype, 0))
+
+    def _write(self, rows):
+        np, dtype = self.np, self.dtype
+        arr = np.empty(len(rows), dtype=dtype)
+        for name, col in zip(LOG_COLUMNS, zip(*rows)):
+            if name == "latency_ms":
+                col = [np.nan if v is None else v for v in col]
+            elif dtype[name].kind == "S":
+                col = [str(v).encode()[:dtype[name].itemsize] for v in col]
+            arr[name] = col
+        self.f.write(arr.tobytes())
+
+    def _close(self):
+        self.f.seek(0)
+        self.f.write(_npy_header(self.dtype, self.count))
+        self.f.close()
+
+class NullResultLogger(ResultLogger):
+    """Keeps no log (path None): rows are dropped as they come."""
+    def log(self, *row, **kwargs):
+        pass
+
+def open_logger(path, fmt=None):
+    """Pick a logger from `fmt`, or from the file extension when fmt is None (path None: no log)."""
+    if path is None:
+        return NullResultLogger(None)
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lstrip(".").lower()
+        fmt = ext if ext in LOG_FORMATS else "csv"
+    if fmt == "csv":
+        return CsvResultLogger(path)
+    if fmt == "parquet":
+        return ParquetResultLogger(path)
+    if fmt == "npy":
+        return NpyResultLogger(path)
+    raise ValueError(f"unknown log format: {fmt}")
@@ -0,0 +1,246 @@
+# metrics.py
+"""
+Instrumentation: per-phase timers, op counters, a rolling status line and a
+Prometheus text exposition (file and/or local HTTP endpoint).
+
+Phases are kept in milliseconds on one of two clocks:
+  - "sim": simulated time (network delay, node queue and stripe lock waits, wake-ups)
+  - "cpu": host time from perf_counter (store I/O, Node.lock, parity compute)
+Values are buffered and binned into LatencyHistograms in batches, so recording
+one costs a list append; METRICS.enabled = False turns recording off. Hot paths
+look their PhaseStats up once (METRICS.phase) and call observe(ms) directly
+when METRICS.enabled; the handles stay valid across reset(). Per-I/O host-time
+phases and the per-I/O sim phases (network, node_queue_wait) are sampled
+(1 call in SAMPLE_EVERY is recorded); their count and total are scaled back
+up, quantiles come from the samples.
+"""
+import os
+from time import perf_counter
+from functools import wraps
+from simulator.histogram import LatencyHistogram
+
+FLUSH_EVERY = 4096
+SAMPLE_EVERY = 8        # sampling interval of the per-I/O phases (node.py)
+
+class PhaseStats:
+    __slots__ = ("clock", "every", "count", "total", "buf", "hist")
+
+    def __init__(self, clock, every=1):
+        self.clock = clock
+        self.every = every      # each observation stands for this many calls
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.buf = []
+        self.hist = None        # built on the first flush
+
+    def observe(self, ms):
+        buf = self.buf
+        buf.append(ms)
+        if len(buf) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        # count/total are folded in here too, keeping observe() to an append
+        if self.buf:
+            self.count += len(self.buf) * self.every
+            self.total += sum(self.buf) * self.every
+            if self.hist is None:
+                self.hist = LatencyHistogram()
+            self.hist.add(self.buf)
+            self.buf = []
+
+    def quantile(self, q):
+        self.flush()
+        return self.hist.quantile(q) if self.hist is not None else float("nan")
+
+class Metrics:
+    """Process-wide registry (see METRICS); reset() at the start of every run."""
+    def __init__(self):
+        self.enabled = True
+        self.phases = {}            # phase -> PhaseStats
+        self.reset()
+
+    def reset(self):
+        # phases are cleared in place so handles from phase() stay valid
+        for stats in self.phases.values():
+            stats.reset()
+        self.ops = {}               # op name -> PhaseStats of its latency (sim ms)
+        self.failures = {}          # op name -> failed count
+        self.interval = None        # op latencies since the last status tick (set by StatusLine)
+        self.gauges = {}
+
+    def _phase(self, table, name, clock, every=1):
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = PhaseStats(clock, every)
+        return stats
+
+    def phase(self, name, clock, every=1):
+        """The PhaseStats of a phase, for callers that record it on a hot path (every: sampling interval)."""
+        return self._phase(self.phases, name, clock, every)
+
+    def sim(self, phase, seconds):
+        """Record a phase measured on the simulation clock (seconds in, kept as ms)."""
+        if self.enabled:
+            (self.phases.get(phase) or self._phase(self.phases, phase, "sim")).observe(seconds * 1000.0)
+
+    def cpu(self, phase, seconds):
+        """Record a phase measured with perf_counter (seconds in, kept as ms)."""
+        if self.enabled:
+            (self.phases.get(phase) or self._phase(self.phases, phase, "cpu")).observe(seconds * 1000.0)
+
+    def timed(self, phase):
+        """Decorator: time every call of a function as a cpu phase."""
+        def wrap(fn):
+            stats = self.phase(phase, "cpu")
+
+            @wraps(fn)
+            def inner(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                t0 = perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    stats.observe((perf_counter() - t0) * 1000.0)
+            return inner
+        return wrap
+
+    def op(self, name, latency_ms):
+        """Record a completed client op (latency None = failed)."""
+        if not self.enabled:
+            return
+        if latency_ms is None:
+            self.failures[name] = self.failures.get(name, 0) + 1
+            return
+        self._phase(self.ops, name, "sim").observe(latency_ms)
+        if self.interval is not None:
+            self.interval.observe(latency_ms)
+
+    def prometheus_text(self):
+        lines = ["# HELP draid_phase_ms Time spent per phase (sim = simulated ms, cpu = host ms).",
+                 "# TYPE draid_phase_ms summary"]
+        for name, st in sorted(self.phases.items()):
+            st.flush()
+            if not st.count:
+                continue
+            labels = f'phase="{name}",clock="{st.clock}"'
+            for q in (0.5, 0.99):
+                lines.append(f'draid_phase_ms{{{labels},quantile="{q}"}} {st.quantile(q):.6f}')
+            lines.append(f"draid_phase_ms_sum{{{labels}}} {st.total:.6f}")
+            lines.append(f"draid_phase_ms_count{{{labels}}} {st.count}")
+        lines += ["# HELP draid_op_latency_ms Client op latency in simulated ms.",
+                  "# TYPE draid_op_latency_ms summary"]
+        for name, st in sorted(self.ops.items()):
+            st.flush()
+            labels = f'op="{name}"'
+            for q in (0.5, 0.99):
+                lines.append(f'draid_op_latency_ms{{{labels},quantile="{q}"}} {st.quantile(q):.6f}')
+            lines.append(f"draid_op_latency_ms_sum{{{labels}}} {st.total:.6f}")
+            lines.append(f"draid_op_latency_ms_count{{{labels}}} {st.count}")
+        if self.failures:
+            lines.append("# TYPE draid_op_failures_total counter")
+        for name, n in sorted(self.failures.items()):
+            lines.append(f'draid_op_failures_total{{op="{name}"}} {n}')
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE draid_{name} gauge")
+            lines.append(f"draid_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        """Per-phase breakdown table for the end-of-run console report."""
+        rows = [f"{'phase':<18} {'clock':>5} {'count':>9} {'total_ms':>12} {'mean_ms':>9} {'p99_ms':>9}"]
+        for name, st in sorted(self.phases.items(), key=lambda kv: (kv[1].clock, kv[0])):
+            st.flush()
+            if not st.count:
+                continue
+            mean = st.total / st.count if st.count else float("nan")
+            rows.append(f"{name:<18} {st.clock:>5} {st.count:>9} {st.total:>12.3f} {mean:>9.4f} "
+                        f"{st.quantile(0.99):>9.4f}")
+        return "\n".join(rows)
+
+METRICS = Metrics()
+
+class MetricsExporter:
+    """
+    Publishes METRICS.prometheus_text(): rewritten atomically to `path` and/or
+    served at http://127.0.0.1:<port>/metrics. The text is rendered by the
+    simulation thread on publish(); the HTTP thread only serves the last copy.
+    """
+    def __init__(self, path=None, port=None):
+        self.path = path
+        self.text = ""
+        self.server = None
+        if port is not None:
+            import threading
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = exporter.text.encode()
+                    self.send_response(200 if self.path.startswith("/metrics") else 404)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def publish(self):
+        self.text = METRICS.prometheus_text()
+        if self.path:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(self.text)
+            os.replace(tmp, self.path)
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+class StatusLine:
+    """
+    Rolling status: every `every_ops` ops, ops/s (simulated) and p50/p99 over
+    that interval, shown on a tqdm bar when `show` is set. Also drives the
+    exporter, so the published metrics are at most one interval old.
+    """
+    def __init__(self, total=None, every_ops=1000, show=True, exporter=None):
+        self.every_ops = every_ops
+        self.exporter = exporter
+        self.bar = None
+        if show:
+            from tqdm import tqdm
+            self.bar = tqdm(total=total, unit="op", dynamic_ncols=True, mininterval=0.5)
+        self._ops = 0
+        self._t = 0.0
+        METRICS.interval = PhaseStats("sim")
+
+    def update(self, ops, now):
+        if ops - self._ops < self.every_ops:
+            return
+        st = METRICS.interval
+        rate = (ops - self._ops) / max(now - self._t, 1e-9)
+        METRICS.gauges["ops_per_second"] = round(rate, 3)
+        METRICS.gauges["ops_total"] = ops
+        if self.bar is not None:
+            self.bar.update(ops - self._ops)
+            self.bar.set_postfix_str(f"sim={now:.2f}s {rate:.0f} op/s p50={st.quantile(0.5):.3f}ms "
+                                     f"p99={st.quantile(0.99):.3f}ms", refresh=False)
+        if self.exporter is not None:
+            self.exporter.publish()
+        METRICS.interval = PhaseStats("sim")
+        self._ops, self._t = ops, now
+
+    def close(self, ops):
+        if self.bar is not None:
+            self.bar.update(ops - self._ops)
+            self.bar.close()
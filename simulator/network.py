@@ -1,31 +1,213 @@
 # network.py
+import json
 import random
-import time
+from simulator.clock import SimClock, Calendar
+from simulator.metrics import METRICS
+
+LINK_WAIT = METRICS.phase("link_wait", "sim")
+
+JITTER_DISTS = ("uniform", "exponential", "lognormal", "pareto")
+
+def sample_jitter_ms(dist, scale_ms, shape=1.0, cap_ms=None):
+    """
+    One jitter sample in ms. scale_ms is the upper bound (uniform), the mean
+    (exponential), the median (lognormal, sigma=shape) or the scale of a Lomax
+    tail (pareto, alpha=shape: mean scale/(alpha-1), infinite variance below 2).
+    """
+    if scale_ms <= 0:
+        return 0.0
+    if dist == "uniform":
+        value = random.uniform(0, scale_ms)
+    elif dist == "exponential":
+        value = random.expovariate(1.0 / scale_ms)
+    elif dist == "lognormal":
+        value = scale_ms * random.lognormvariate(0.0, shape)
+    elif dist == "pareto":
+        value = scale_ms * (random.paretovariate(shape) - 1.0)
+    else:
+        raise ValueError(f"unknown jitter distribution {dist!r} (expected one of {JITTER_DISTS})")
+    return value if cap_ms is None else min(value, cap_ms)
+
+class Link:
+    """
+    A link shared by the transfers crossing it; each holds it for bytes / bandwidth.
+    Transfers are reserved as busy intervals, so one issued at an earlier simulated
+    time than those already reserved uses the idle gap before them (no false queueing).
+    """
+    def __init__(self, name, mbps):
+        self.name = name
+        self.mbps = mbps
+        self.calendar = Calendar()
+        self.busy_s = 0.0
+        self.wait_s = 0.0       # time transfers spent waiting for this link
+        self.bytes = 0
+        self.transfers = 0
+
+    def serialize_s(self, nbytes):
+        return nbytes * 8 / (self.mbps * 1e6)
+
+class SpeedClass:
+    """Per-node network personality: NIC bandwidth, base latency and jitter scale."""
+    def __init__(self, name, nic_mbps, base_ms=1.0, jitter_ms=0.5):
+        self.name = name
+        self.nic_mbps = nic_mbps
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+
+class Topology:
+    """
+    Rack model: controller -- shared switch uplink -- switch -- node NIC -- node.
+    Every transfer crosses the uplink and its node's NIC. Each node belongs to a
+    speed class (NIC bandwidth, base latency, jitter scale); nodes not listed use
+    `default_class`. Jitter follows one distribution for the whole rack.
+
+    Config (JSON, see experiments/rack_topology.json):
+        {"uplink_mbps": 1000,
+         "jitter": {"dist": "lognormal", "shape": 0.8, "cap_ms": 50},
+         "classes": {"standard": {"nic_mbps": 200, "base_ms": 1.0, "jitter_ms": 0.5}, ...},
+         "default_class": "standard",
+         "nodes": {"0": "fast", "5": "slow"}}
+    """
+    def __init__(self, uplink_mbps, classes, default_class, nodes=None, jitter="uniform",
+                 jitter_shape=1.0, jitter_cap_ms=None):
+        if default_class not in classes:
+            raise ValueError(f"default class {default_class!r} is not defined")
+        self.uplink = Link("uplink", uplink_mbps)
+        self.classes = classes
+        self.default_class = default_class
+        self.node_classes = {}
+        for node_id, name in (nodes or {}).items():
+            self.assign(int(node_id), name)
+        if jitter not in JITTER_DISTS:
+            raise ValueError(f"unknown jitter distribution {jitter!r} (expected one of {JITTER_DISTS})")
+        self.jitter = jitter
+        self.jitter_shape = jitter_shape
+        self.jitter_cap_ms = jitter_cap_ms
+        self.nics = {}
+
+    @classmethod
+    def from_dict(cls, cfg):
+        classes = {name: SpeedClass(name, **spec) for name, spec in cfg["classes"].items()}
+        jitter = cfg.get("jitter", {})
+        return cls(cfg["uplink_mbps"], classes, cfg.get("default_class", next(iter(classes))),
+                   nodes=cfg.get("nodes"), jitter=jitter.get("dist", "uniform"),
+                   jitter_shape=jitter.get("shape", 1.0), jitter_cap_ms=jitter.get("cap_ms"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def assign(self, node_id, class_name):
+        if class_name not in self.classes:
+            raise ValueError(f"node {node_id}: unknown speed class {class_name!r}")
+        self.node_classes[node_id] = class_name
+
+    def class_of(self, node_id):
+        return self.classes[self.node_classes.get(node_id, self.default_class)]
+
+    def nic(self, node_id):
+        link = self.nics.get(node_id)
+        if link is None:
+            link = self.nics[node_id] = Link(f"nic{node_id}", self.class_of(node_id).nic_mbps)
+        return link
+
+    def links(self):
+        return [self.uplink] + [self.nics[i] for i in sorted(self.nics)]
+
+class Transfer:
+    """One planned transfer: the links it crosses, their serialization times and its fixed latency."""
+    __slots__ = ("nbytes", "links", "serialize", "latency", "duration")
+
+    def __init__(self, nbytes, links, serialize, latency):
+        self.nbytes = nbytes
+        self.links = links
+        self.serialize = serialize
+        self.latency = latency
+        self.duration = max(serialize, default=0.0) + latency
 
 class NetworkSimulator:
     """
-    Simple network delay model. Keep calls fast (no huge sleep).
-    You can scale down time by 'scale' to accelerate experiments.
+    Simple network delay model on a virtual clock.
+    Transfers advance the simulated clock instead of sleeping, so a run costs
+    only the CPU time of the simulator itself.
+    Without a topology every transfer gets base latency, uniform jitter and a
+    private link of bw_mbps; a read (small request) pays the jitter only. With one
+    (Topology), transfers to a node share the uplink and the node's NIC and queue
+    behind each other when they saturate; latency follows the node's speed class
+    the same way (base + jitter for a send, jitter only for a read) on top of the
+    serialization on the links.
+    plan() / fit() / commit() let a caller (Node) find a start time that suits
+    its own queue as well; simulate_send() / simulate_small() do all three at once.
     """
-    def __init__(self, base_ms=1.0, jitter_ms=0.5, bw_mbps=100.0, time_scale=0.001):
+    def __init__(self, base_ms=1.0, jitter_ms=0.5, bw_mbps=100.0, clock=None, topology=None):
         self.base_ms = base_ms
         self.jitter_ms = jitter_ms
         self.bw_mbps = bw_mbps
-        # time_scale multiplies real sleep time so experiments don't take too long;
-        # e.g., time_scale=0.001 means 1ms simulated -> 1 microsecond actual.
-        self.time_scale = time_scale
+        self.clock = clock if clock is not None else SimClock()
+        self.topology = topology
 
     def transfer_delay_sec(self, bytes_len):
         transfer_ms = (bytes_len * 8) / (self.bw_mbps * 1e6) * 1000.0
         delay_ms = self.base_ms + transfer_ms + random.uniform(0, self.jitter_ms)
-        return (delay_ms / 1000.0) * self.time_scale
+        return delay_ms / 1000.0
 
     def small_delay_sec(self):
         delay_ms = random.uniform(0, self.jitter_ms)
-        return (delay_ms / 1000.0) * self.time_scale
+        return delay_ms / 1000.0
+
+    def plan(self, bytes_len, node_id=None, send=True):
+        """A Transfer for `bytes_len` bytes to (send) or from (read) node_id; samples its jitter."""
+        topo = self.topology
+        if topo is None or node_id is None:
+            return Transfer(bytes_len, (), (), self.transfer_delay_sec(bytes_len) if send else self.small_delay_sec())
+        speed = topo.class_of(node_id)
+        links = (topo.uplink, topo.nic(node_id))
+        jitter = sample_jitter_ms(topo.jitter, speed.jitter_ms, topo.jitter_shape, topo.jitter_cap_ms)
+        return Transfer(bytes_len, links, tuple(link.serialize_s(bytes_len) for link in links),
+                        ((speed.base_ms if send else 0.0) + jitter) / 1000.0)
+
+    def fit(self, transfer, t):
+        """Earliest start >= t at which every link of the transfer is free long enough."""
+        while True:
+            start = t
+            for link, s in zip(transfer.links, transfer.serialize):
+                start = link.calendar.fit(start, s)
+            if start == t:
+                return t
+            t = start
+
+    def commit(self, transfer, start, requested):
+        """Reserve the links from `start` (asked for at `requested`); returns the completion time."""
+        wait = start - requested
+        for link, s in zip(transfer.links, transfer.serialize):
+            link.calendar.prune(self.clock.horizon)
+            link.calendar.reserve(start, start + s)
+            link.busy_s += s
+            link.wait_s += wait
+            link.bytes += transfer.nbytes
+            link.transfers += 1
+        if transfer.links and METRICS.enabled:
+            LINK_WAIT.observe(wait * 1000.0)
+        return start + transfer.duration
+
+    def _send(self, transfer):
+        now = self.clock.now
+        self.clock.advance_to(self.commit(transfer, self.fit(transfer, now), now))
+
+    def simulate_send(self, bytes_len, node_id=None):
+        self._send(self.plan(bytes_len, node_id))
 
-    def simulate_send(self, bytes_len):
-        time.sleep(self.transfer_delay_sec(bytes_len))
+    def simulate_small(self, node_id=None, bytes_len=0):
+        # a read: a small request; with a topology the returned chunk also crosses the links
+        self._send(self.plan(bytes_len, node_id, send=False))
 
-    def simulate_small(self):
-        time.sleep(self.small_delay_sec())
+    def report(self, elapsed):
+        """Per-link utilization lines (topology only)."""
+        if self.topology is None:
+            return []
+        elapsed = max(elapsed, 1e-9)
+        return [f"{link.name} ({link.mbps:g} Mbit/s): util={link.busy_s / elapsed:.1%} "
+                f"MB={link.bytes / 1e6:.2f} transfers={link.transfers} "
+                f"wait={link.wait_s / max(link.transfers, 1) * 1000:.3f}ms/transfer"
+                for link in self.topology.links()]
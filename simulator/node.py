@@ -1,52 +1,110 @@
 # node.py
-import os
 from pathlib import Path
 from threading import Lock
-from simulator.constants import BLOCK_SIZE
-import time
+from simulator.clock import SimResource
+from simulator.store import make_store
+from simulator.metrics import METRICS, SAMPLE_EVERY
+from time import perf_counter
+
+# phase handles, looked up once (see metrics.py)
+NETWORK = METRICS.phase("network", "sim", SAMPLE_EVERY)
+WAKE = METRICS.phase("wake", "sim")
+NODE_LOCK = METRICS.phase("node_lock", "cpu", SAMPLE_EVERY)
+STORE_READ = METRICS.phase("store_read", "cpu", SAMPLE_EVERY)
+STORE_WRITE = METRICS.phase("store_write", "cpu", SAMPLE_EVERY)
 
 class Node:
-    def __init__(self, node_id, base_dir, network: 'NetworkSimulator'):
+    def __init__(self, node_id, base_dir, network: 'NetworkSimulator', queue_depth=1, store="file"):
         self.id = node_id
         self.base_dir = Path(base_dir) / f"node_{node_id}"
-        self.base_dir.mkdir(parents=True, exist_ok=True)
         self.network = network
+        # chunk storage backend: "file" (one file per chunk), "packed" (one slot file + index)
+        # or "memory" (a dict; base_dir is never created)
+        self.store = make_store(store, self.base_dir)
+        self.clock = network.clock
         self.alive = True
         self.lock = Lock()
+        # at most queue_depth requests are serviced at once; the rest wait in simulated time
+        self.queue = SimResource(self.clock, capacity=queue_depth, name="node_queue_wait",
+                                 every=SAMPLE_EVERY)
+        # optional NodePower (see EnergyManager.attach): charges energy, adds wake-up latency
+        self.energy = None
+        self.store_ops = 0      # sampling counter for the store_* / node_lock phases
 
     def chunk_path(self, chunk_id: str):
         return self.base_dir / f"{chunk_id}.chk"
 
+    def _schedule(self, transfer):
+        # first start at which a queue slot is free for the whole I/O (wake-up, link waits,
+        # transfer) and the transfer's links are free: (start, slot, wake, link start)
+        t = self.clock.now
+        while True:
+            wake = self.energy.wake_delay(t) if self.energy is not None else 0.0
+            t_link = self.network.fit(transfer, t + wake)
+            start, slot = self.queue.fit(t, t_link - t + transfer.duration)
+            if start == t:
+                return t, slot, wake, t_link
+            t = start
+
+    def _io(self, transfer):
+        # one queued I/O carrying `transfer`; the clock ends at its completion
+        requested = self.clock.now
+        t0, slot, wake, t_link = self._schedule(transfer)
+        end = self.network.commit(transfer, t_link, t0 + wake)
+        self.queue.claim(slot, t0, end, requested)
+        if METRICS.enabled:
+            if wake:
+                WAKE.observe(wake * 1000.0)
+            if not self.queue.holds % SAMPLE_EVERY:     # the I/Os node_queue_wait samples
+                NETWORK.observe((end - t0 - wake) * 1000.0)
+        self.clock.advance_to(end)
+        if self.energy is not None:
+            self.energy.end_io(t0, end, transfer.nbytes)
+
+    def _store_op(self, stats, fn, *args):
+        # host time spent waiting for Node.lock and inside the store (every SAMPLE_EVERY-th op)
+        self.store_ops += 1
+        if not METRICS.enabled or self.store_ops % SAMPLE_EVERY:
+            with self.lock:
+                return fn(*args)
+        c0 = perf_counter()
+        with self.lock:
+            c1 = perf_counter()
+            result = fn(*args)
+        c2 = perf_counter()
+        NODE_LOCK.observe((c1 - c0) * 1000.0)
+        stats.observe((c2 - c1) * 1000.0)
+        return result
+
     def write_chunk(self, chunk_id: str, data: bytes):
         if not self.alive:
             raise RuntimeError("Node is down")
-        # simulate network transfer
-        self.network.simulate_send(len(data))
-        with self.lock:
-            with open(self.chunk_path(chunk_id), "wb") as f:
-                f.write(data)
+        # simulate network transfer (queue slot, wake-up and links reserved together)
+        self._io(self.network.plan(len(data), self.id))
+        self._store_op(STORE_WRITE, self.store.write, chunk_id, data)
 
     def read_chunk(self, chunk_id: str) -> bytes:
         if not self.alive:
             raise RuntimeError("Node is down")
-        p = self.chunk_path(chunk_id)
-        if not p.exists():
+        if not self.store.exists(chunk_id):
             raise FileNotFoundError(chunk_id)
-        self.network.simulate_small()
-        with self.lock:
-            with open(p, "rb") as f:
-                return f.read()
+        data = self._store_op(STORE_READ, self.store.read, chunk_id)
+        # request + (with a topology) the chunk's trip back over the links
+        self._io(self.network.plan(len(data), self.id, send=False))
+        return data
 
     def delete_chunk(self, chunk_id: str):
-        p = self.chunk_path(chunk_id)
-        if p.exists():
-            p.unlink()
+        self.store.delete(chunk_id)
 
     def list_chunks(self):
-        return [f.stem for f in self.base_dir.glob("*.chk")]
+        return self.store.list()
 
     def fail(self):
         self.alive = False
 
     def recover(self):
         self.alive = True
+
+    def close(self):
+        """Release the store's file handles (the node is unusable afterwards)."""
+        self.store.close()
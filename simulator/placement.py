@@ -0,0 +1,184 @@
+# placement.py
+"""
+Placement engines: map a stripe to the k + r node slots (positions in
+Controller.nodes) holding its chunks, given the current member slots.
+All engines are deterministic functions of (stripe_id, members), so the
+controller only records placements for written stripes and can recompute
+targets after a membership change to find the chunks that have to move.
+
+Controller.members is a tuple that is replaced (never mutated) on change;
+engines key their caches on its identity.
+
+A new target only fixes the set of nodes a placed stripe should use; stable_order()
+keeps every chunk whose node is still in that set at its index (like CRUSH "indep"
+mode for erasure-coded pools), so only the chunks of departed nodes move.
+"""
+import math
+
+PLACEMENTS = ["roundrobin", "hash", "rendezvous", "declustered"]
+
+_GOLDEN = 0x9E3779B97F4A7C15
+
+# numpy is only needed by the hashed/declustered engines; imported on first use
+def _np():
+    import numpy as np
+    return np
+
+def _mix(x):
+    """splitmix64 finalizer over uint64 numpy values (wrapping arithmetic)."""
+    np = _np()
+    x = np.asarray(x, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+def _check(width, members):
+    if width > len(members):
+        raise ValueError(f"stripe width {width} exceeds {len(members)} member nodes")
+
+class RoundRobinPlacement:
+    """The original layout: k + r consecutive members starting at stripe_id % N."""
+    def __init__(self, width):
+        self.width = width
+
+    def place(self, stripe_id, members):
+        _check(self.width, members)
+        n = len(members)
+        start = stripe_id % n
+        return [members[(start + i) % n] for i in range(self.width)]
+
+class ConsistentHashPlacement:
+    """
+    Consistent hashing: every member owns `vnodes` points on a 64-bit ring; a
+    stripe takes the first k + r distinct owners clockwise from its hash.
+    Adding or removing a member only moves the stripes next to its points.
+    """
+    def __init__(self, width, vnodes=64):
+        self.width = width
+        self.vnodes = vnodes
+        self._members = None
+
+    def _ring(self, members):
+        np = _np()
+        if members is not self._members:
+            slots = np.repeat(np.asarray(members, dtype=np.uint64), self.vnodes)
+            vnode = np.tile(np.arange(self.vnodes, dtype=np.uint64), len(members))
+            with np.errstate(over="ignore"):
+                points = _mix(_mix(slots + np.uint64(1)) ^ (vnode * np.uint64(_GOLDEN)))
+            order = np.argsort(points, kind="stable")
+            self._points, self._owners = points[order], slots[order].astype(np.int64).tolist()
+            self._members = members
+
+    def place(self, stripe_id, members):
+        _check(self.width, members)
+        self._ring(members)
+        i = int(_np().searchsorted(self._points, _mix(stripe_id)))
+        owners, n = self._owners, len(self._owners)
+        chosen = []
+        while len(chosen) < self.width:
+            slot = owners[i % n]
+            if slot not in chosen:
+                chosen.append(slot)
+            i += 1
+        return chosen
+
+class RendezvousPlacement:
+    """
+    CRUSH straw2-like rendezvous hashing: each member draws a pseudo-random
+    straw ln(u) / weight for the stripe and the k + r longest straws win (in
+    straw order). A membership change only moves chunks whose winner changed.
+    `weights` maps slot -> relative capacity (default 1).
+    """
+    def __init__(self, width, weights=None):
+        self.width = width
+        self.weights = weights or {}
+        self._members = None
+
+    def place(self, stripe_id, members):
+        _check(self.width, members)
+        np = _np()
+        if members is not self._members:
+            self._slots = np.asarray(members, dtype=np.uint64)
+            self._slot_hash = _mix(self._slots + np.uint64(1))
+            self._w = np.array([self.weights.get(m, 1.0) for m in members])
+            self._members = members
+        with np.errstate(over="ignore"):
+            h = _mix(self._slot_hash ^ _mix(np.uint64(stripe_id) * np.uint64(_GOLDEN)))
+        u = ((h >> np.uint64(11)).astype(np.float64) + 0.5) / float(1 << 53)
+        straws = np.log(u) / self._w
+        top = np.argsort(-straws, kind="stable")[:self.width]
+        return [members[i] for i in top]
+
+class DeclusteredPlacement:
+    """
+    Parity-declustered layout: members are shuffled into a fresh pseudo-random
+    permutation for every group of N // (k + r) stripes, and the group's
+    stripes take consecutive disjoint runs of it. When (k + r) divides N every
+    node holds one chunk per group. Otherwise the N mod (k + r) spare nodes
+    rotate from group to group (group g leaves out members g*spare .. in turn),
+    so every node holds the same number of chunks over each N / gcd(N, spare)
+    groups. The stripes sharing a node are spread over all others, so a
+    rebuild reads from the whole cluster instead of neighbours.
+    Permutations depend on N, so membership changes move most chunks.
+    """
+    def __init__(self, width, seed=0):
+        self.width = width
+        self.seed = seed
+        self._members = None
+        self._perms = {}
+        self._orders = {}       # cycle -> order the spare nodes are taken from
+
+    def place(self, stripe_id, members):
+        _check(self.width, members)
+        if members is not self._members:
+            self._perms = {}
+            self._orders = {}
+            self._members = members
+        per_group = len(members) // self.width
+        group, row = divmod(stripe_id, per_group)
+        perm = self._perms.get(group)
+        if perm is None:
+            if len(self._perms) > 4096:
+                self._perms.clear()
+                self._orders.clear()
+            n = len(members)
+            perm = self._perms[group] = _np().random.default_rng((self.seed, group)).permutation(n)
+            spare = n - per_group * self.width
+            if spare:
+                self._rotate_spare(perm, group, spare)
+        return [members[i] for i in perm[row * self.width:(row + 1) * self.width]]
+
+    def _rotate_spare(self, perm, group, spare):
+        # within each cycle of n / gcd(n, spare) groups, walk a shuffled order of the
+        # members `spare` at a time: those are the group's spares, swapped to the tail
+        n = len(perm)
+        cycle_len = n // math.gcd(n, spare)
+        cycle, step = divmod(group, cycle_len)
+        order = self._orders.get(cycle)
+        if order is None:
+            order = self._orders[cycle] = _np().random.default_rng((self.seed, cycle, n)).permutation(n).tolist()
+        skip = {order[(step * spare + j) % n] for j in range(spare)}
+        used = n - spare
+        tail = [i for i in range(used, n) if perm[i] not in skip]
+        for i in range(used):
+            if perm[i] in skip:
+                j = tail.pop()
+                perm[i], perm[j] = perm[j], perm[i]
+
+def stable_order(target, current):
+    """Order `target` so chunks on nodes in both layouts keep their index; the new nodes fill the rest."""
+    keep = set(target) & set(current)
+    fresh = iter([n for n in target if n not in keep])
+    return tuple(n if n in keep else next(fresh) for n in current)
+
+def make_placement(kind, width):
+    if kind == "roundrobin":
+        return RoundRobinPlacement(width)
+    if kind == "hash":
+        return ConsistentHashPlacement(width)
+    if kind == "rendezvous":
+        return RendezvousPlacement(width)
+    if kind == "declustered":
+        return DeclusteredPlacement(width)
+    raise ValueError(f"unknown placement {kind!r} (expected one of {PLACEMENTS})")
@@ -1,5 +1,6 @@
 # predictor.py
-import time
+import heapq
+import math
 from collections import defaultdict, deque
 
 class HotStripePredictor:
@@ -24,3 +25,181 @@ class HotStripePredictor:
 
     def is_hot(self, stripe_id):
         return self.counts.get(stripe_id, 0) >= self.threshold
+
+# ---------------------------------------------------------------------------
+# Fixed-memory engines. Time is counted in observations; counts decay by
+# exp(-1/window_size) per observation, so a stripe seen with probability p
+# settles at p * window_size, the same scale as the sliding window's count
+# (threshold means the same thing for every engine). Decay is applied lazily:
+# increments are scaled up by a growing global factor instead of shrinking
+# every counter, and everything is renormalized once the factor gets large.
+# ---------------------------------------------------------------------------
+
+_RENORM_AT = 1e150
+_M64 = (1 << 64) - 1
+# one odd 64-bit multiplier per hash function (Fibonacci hashing)
+_MULTS = [(0x9E3779B97F4A7C15 * (2 * d + 1)) & _M64 for d in range(16)]
+
+def _shift(slots):
+    """Shift that maps a 64-bit product onto a power-of-two table of >= slots entries."""
+    return 64 - max(1, int(slots) - 1).bit_length()
+
+def _slot(stripe_id, d, shift):
+    return ((int(stripe_id) * _MULTS[d]) & _M64) >> shift
+
+class DecayPredictor:
+    """
+    Exponentially decayed access counters in a fixed table of hashed slots.
+    O(1) observe/is_hot; memory is `slots` floats however many stripes exist
+    (stripes sharing a slot share a counter).
+    """
+    def __init__(self, window_size=1000, threshold=20, slots=1 << 16):
+        self.threshold = threshold
+        self.growth = math.exp(1.0 / window_size)
+        self.shift = _shift(slots)
+        self.counts = [0.0] * (1 << (64 - self.shift))     # scaled by self.scale
+        self.scale = 1.0
+
+    def _tick(self):
+        self.scale *= self.growth
+        if self.scale > _RENORM_AT:
+            self.counts = [c / self.scale for c in self.counts]
+            self.scale = 1.0
+
+    def observe(self, stripe_id):
+        self._tick()
+        self.counts[_slot(stripe_id, 0, self.shift)] += self.scale
+
+    def count(self, stripe_id):
+        return self.counts[_slot(stripe_id, 0, self.shift)] / self.scale
+
+    def is_hot(self, stripe_id):
+        return self.count(stripe_id) >= self.threshold
+
+class CountMinPredictor:
+    """
+    Decayed Count-Min Sketch (depth x width, conservative update) plus a top_k
+    heavy-hitter table. A stripe is hot if it is among the top_k and its
+    estimate reaches threshold. Sketch estimates only over-count, so the
+    top-k cap bounds false positives from hash collisions. The top-k table is
+    a dict plus a lazily cleaned min-heap: O(log top_k) per update.
+    """
+    def __init__(self, window_size=1000, threshold=20, width=4096, depth=4, top_k=64):
+        self.threshold = threshold
+        self.growth = math.exp(1.0 / window_size)
+        self.mask = (1 << (64 - _shift(width))) - 1
+        self.rows = [[0.0] * (self.mask + 1) for _ in range(depth)]
+        self.top_k = top_k
+        self.top = {}               # stripe_id -> scaled estimate at its last observation
+        self.heap = []              # (estimate, stripe_id) min-heap over self.top, with stale entries
+        self.scale = 1.0
+
+    def _tick(self):
+        self.scale *= self.growth
+        if self.scale > _RENORM_AT:
+            s = self.scale
+            self.rows = [[c / s for c in row] for row in self.rows]
+            self.top = {k: v / s for k, v in self.top.items()}
+            self.heap = [(v, k) for k, v in self.top.items()]
+            heapq.heapify(self.heap)
+            self.scale = 1.0
+
+    def _slots(self, stripe_id):
+        # one multiply, then double hashing (h1 + d * h2) for the depth rows
+        h = (int(stripe_id) * _MULTS[0]) & _M64
+        h1, h2, mask = h >> 32, (h & 0xFFFFFFFF) | 1, self.mask
+        return [(h1 + d * h2) & mask for d in range(len(self.rows))]
+
+    def _estimate(self, stripe_id):
+        return min([row[i] for row, i in zip(self.rows, self._slots(stripe_id))])
+
+    def observe(self, stripe_id):
+        self._tick()
+        cells = list(zip(self.rows, self._slots(stripe_id)))
+        est = min([row[i] for row, i in cells]) + self.scale
+        for row, i in cells:
+            if row[i] < est:        # conservative update: only raise counters below the new estimate
+                row[i] = est
+        top, heap = self.top, self.heap
+        if stripe_id not in top and len(top) >= self.top_k:
+            # drop stale heap entries, then evict the smallest member if the newcomer beats it
+            while top.get(heap[0][1]) != heap[0][0]:
+                heapq.heappop(heap)
+            if heap[0][0] >= est:
+                return
+            del top[heapq.heappop(heap)[1]]
+        top[stripe_id] = est
+        heapq.heappush(heap, (est, stripe_id))
+        if len(heap) > 4 * self.top_k:
+            self.heap = heap = [(v, k) for k, v in top.items()]
+            heapq.heapify(heap)
+
+    def count(self, stripe_id):
+        return self._estimate(stripe_id) / self.scale
+
+    def is_hot(self, stripe_id):
+        return stripe_id in self.top and self.count(stripe_id) >= self.threshold
+
+class OnlinePredictor:
+    """
+    Online logistic model (scikit-learn SGDClassifier, trained with partial_fit).
+    Per hashed slot it keeps a fast and a slow decayed count and the time of the
+    last access. Each access labels the features recorded at the previous access
+    of that slot: hot if it came back within window_size / threshold observations
+    (i.e. at the rate the other engines call hot). Training is batched; prediction
+    uses the copied coefficients, so observe/is_hot stay O(1).
+    Requires scikit-learn.
+    """
+    def __init__(self, window_size=1000, threshold=20, slots=1 << 16, batch=256):
+        try:
+            from sklearn.linear_model import SGDClassifier
+        except ImportError as e:
+            raise RuntimeError("the sgd predictor requires scikit-learn (pip install scikit-learn)") from e
+        self.model = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=0)
+        self.window_size = window_size
+        self.threshold = threshold
+        self.horizon = window_size / threshold
+        self.fast = DecayPredictor(max(1, window_size // 4), threshold, slots)
+        self.slow = DecayPredictor(window_size, threshold, slots)
+        self.shift = self.slow.shift
+        self.last_seen = [-1] * len(self.slow.counts)
+        self.pending = [None] * len(self.slow.counts)   # features recorded at the last access
+        self.batch = batch
+        self.X, self.y = [], []
+        self.coef = None
+        self.t = 0
+
+    def _features(self, stripe_id, slot):
+        last = self.last_seen[slot]
+        gap = self.t - last if last >= 0 else 10 * self.window_size
+        return [math.log1p(self.fast.count(stripe_id)), math.log1p(self.slow.count(stripe_id)),
+                min(gap / self.window_size, 10.0)]
+
+    def observe(self, stripe_id):
+        self.t += 1
+        slot = _slot(stripe_id, 0, self.shift)
+        if self.pending[slot] is not None:
+            self.X.append(self.pending[slot])
+            self.y.append(int(self.t - self.last_seen[slot] <= self.horizon))
+        self.pending[slot] = self._features(stripe_id, slot)
+        self.fast.observe(stripe_id)
+        self.slow.observe(stripe_id)
+        self.last_seen[slot] = self.t
+        if len(self.X) >= self.batch:
+            self.model.partial_fit(self.X, self.y, classes=[0, 1])
+            self.coef = list(self.model.coef_[0]) + [float(self.model.intercept_[0])]
+            self.X, self.y = [], []
+
+    def is_hot(self, stripe_id):
+        if self.coef is None:
+            # untrained yet: fall back to the decayed count
+            return self.slow.is_hot(stripe_id)
+        x = self._features(stripe_id, _slot(stripe_id, 0, self.shift))
+        return sum(w * v for w, v in zip(self.coef, x)) + self.coef[-1] > 0.0
+
+PREDICTORS = {"window": HotStripePredictor, "decay": DecayPredictor, "cms": CountMinPredictor,
+              "sgd": OnlinePredictor}
+
+def make_predictor(kind="window", window_size=1000, threshold=20, **kwargs):
+    """Build a predictor engine by name; all share observe(stripe_id) / is_hot(stripe_id)."""
+    return PREDICTORS[kind](window_size, threshold, **kwargs)
@@ -0,0 +1,155 @@
+# rebuild.py
+from collections import Counter
+
+class RebuildJob:
+    """
+    Background rebuild of every stripe chunk a failed node held, driven by the
+    controller's chunk-location index. `workers` chunks are rebuilt concurrently
+    (as events on the simulation clock); `bandwidth_mbps` (Mbit/s, like the network
+    model) optionally caps the rebuild traffic (bytes read + written).
+    """
+    def __init__(self, controller, work, replacement_node, workers=4, bandwidth_mbps=None):
+        self.controller = controller
+        self.clock = controller.clock
+        self.work = list(work)          # [(stripe_id, chunk_index)]
+        self.replacement = replacement_node
+        self.workers = max(1, workers)
+        self.bandwidth_mbps = bandwidth_mbps
+        self.total = len(self.work)
+        self.rebuilt = 0
+        self.skipped = 0                # chunks rewritten by foreground writes meanwhile
+        self.failed = 0
+        self.bytes_moved = 0
+        self.sources = Counter()        # node position -> chunks read from it
+        self.started_at = None
+        self.finished_at = None
+        self._bucket_at = 0.0           # time the bandwidth cap frees up again
+        self._running = 0
+        self.on_done = None
+
+    @property
+    def active(self):
+        return self.started_at is not None and self.finished_at is None
+
+    def start(self):
+        self.started_at = self._bucket_at = self.clock.now
+        self.work.reverse()             # pop() from the end == FIFO over the original order
+        self._running = self.workers
+        for _ in range(self.workers):
+            self.clock.schedule(self.clock.now, self._worker_step)
+        return self
+
+    def _process(self, item):
+        """Handle one work item; returns the bytes moved (0 = nothing to do)."""
+        stripe_id, chunk_index = item
+        return self.controller.rebuild_chunk(stripe_id, chunk_index, self.replacement, self.sources)
+
+    def _worker_step(self):
+        if not self.work:
+            self._running -= 1
+            if self._running == 0:
+                self.finished_at = self.clock.now
+                if self.on_done:
+                    self.on_done(self)
+            return
+        item = self.work.pop()
+        t0 = self.clock.now
+        try:
+            moved = self._process(item)
+        except Exception:
+            self.failed += 1
+            moved = 0
+        else:
+            if moved:
+                self.rebuilt += 1
+            else:
+                self.skipped += 1
+        self.bytes_moved += moved
+        next_at = self.clock.now
+        if self.bandwidth_mbps and moved:
+            # each chunk spends moved/bandwidth seconds of the shared budget
+            self._bucket_at = max(self._bucket_at, t0) + moved * 8 / (self.bandwidth_mbps * 1e6)
+            next_at = max(next_at, self._bucket_at)
+        self.clock.schedule(next_at, self._worker_step)
+
+    def _elapsed(self):
+        end = self.finished_at if self.finished_at is not None else self.clock.now
+        start = self.started_at if self.started_at is not None else end
+        return max(end - start, 1e-9)
+
+    def stats(self):
+        elapsed = self._elapsed()
+        reads = sum(self.sources.values())
+        return {
+            "chunks": self.total,
+            "rebuilt": self.rebuilt,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes_moved": self.bytes_moved,
+            "time_to_redundancy_s": elapsed if self.finished_at is not None else None,
+            "throughput_MBps": self.bytes_moved / elapsed / 1e6,
+            # rebuild parallelism: how many nodes served reads, and the busiest one's share
+            "source_nodes": len(self.sources),
+            "max_source_share": max(self.sources.values()) / reads if reads else None,
+        }
+
+class MigrationJob(RebuildJob):
+    """
+    Background rebalance after a membership change: moves each listed stripe to
+    its new placement-engine target (only the chunks whose node changed), with
+    the same worker / bandwidth limits as a rebuild.
+    """
+    def __init__(self, controller, stripes, workers=4, bandwidth_mbps=None):
+        super().__init__(controller, stripes, None, workers, bandwidth_mbps)
+
+    def _process(self, stripe_id):
+        return self.controller.rebalance_stripe(stripe_id)
+
+    def stats(self):
+        elapsed = self._elapsed()
+        return {
+            "stripes": self.total,
+            "migrated": self.rebuilt,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes_moved": self.bytes_moved,
+            "rebalance_time_s": elapsed if self.finished_at is not None else None,
+            "throughput_MBps": self.bytes_moved / elapsed / 1e6,
+        }
+
+class ScrubJob(RebuildJob):
+    """
+    Background parity scrub: each worker step verifies a batch of `batch` stripes
+    (Controller.scrub_stripe) and repairs mismatched parity. `bandwidth_mbps` caps
+    the scrub traffic (bytes read + repaired) so foreground I/O keeps the links.
+    """
+    def __init__(self, controller, stripes, batch=16, workers=1, bandwidth_mbps=None):
+        stripes = list(stripes)
+        batches = [stripes[i:i + batch] for i in range(0, len(stripes), batch)]
+        super().__init__(controller, batches, None, workers, bandwidth_mbps)
+        self.stripes = len(stripes)
+        self.status = Counter()         # clean / repaired / unreadable
+
+    def _process(self, batch):
+        moved = 0
+        for stripe_id in batch:
+            status, m = self.controller.scrub_stripe(stripe_id)
+            self.status[status] += 1
+            moved += m
+        return moved
+
+    def stats(self):
+        elapsed = self._elapsed()
+        checked = sum(self.status.values())
+        return {
+            "stripes": self.stripes,
+            "checked": checked,
+            "clean": self.status["clean"],
+            "repaired": self.status["repaired"],
+            "unreadable": self.status["unreadable"],
+            "failed_batches": self.failed,
+            "bytes_scanned": self.bytes_moved,
+            "scrub_time_s": elapsed if self.finished_at is not None else None,
+            "throughput_MBps": self.bytes_moved / elapsed / 1e6,
+            "stripes_per_s": checked / elapsed,
+        }
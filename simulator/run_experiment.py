@@ -1,176 +1,746 @@
 # run_experiment.py
 import os
+import shutil
 import argparse
-import time
-import csv
-from simulator.network import NetworkSimulator
+import types
+from array import array
+# light imports only: numpy (parity, workload) and tqdm (status line) load when a run is built
+from simulator.clock import SimClock
+from simulator.network import NetworkSimulator, Topology
 from simulator.node import Node
-from simulator.controller import Controller
-from simulator.client import WorkloadGenerator
-from simulator.predictor import HotStripePredictor
-from simulator.energy_manager import EnergyManager
-from simulator.constants import LOG_FORMAT
-from tqdm import trange
+from simulator.journal import IntentJournal, ControllerCrash
+from simulator.rebuild import ScrubJob
+from simulator.placement import PLACEMENTS
+from simulator.predictor import make_predictor, PREDICTORS
+from simulator.energy_manager import EnergyManager, ParityDeferral
+from simulator.logger import open_logger, LOG_FORMATS
+from simulator.store import STORE_TYPES
+from simulator.constants import BLOCKS_PER_STRIPE, PARITY_BLOCKS
+from simulator.cache import HotStripeCache, CACHE_POLICIES, WRITE_POLICIES
+from simulator.metrics import METRICS, MetricsExporter, StatusLine
 
 LOGFILE = "experiment_log.csv"
+CACHE_STATS_EVERY = 1000    # ops between "cache" counter rows in the log
+STATUS_EVERY = 1000         # ops between status line / metrics endpoint refreshes
 
-def setup_nodes(base_dir, num_nodes, network):
+def setup_nodes(base_dir, num_nodes, network, queue_depth=1, store="file"):
     nodes = []
     for i in range(num_nodes):
-        nodes.append(Node(i, base_dir, network))
+        nodes.append(Node(i, base_dir, network, queue_depth=queue_depth, store=store))
     return nodes
 
 def clear_node_dirs(base_dir):
-    if os.path.exists(base_dir):
-        # remove existing files carefully
-        for entry in os.scandir(base_dir):
-            if entry.is_dir():
-                for f in os.scandir(entry.path):
-                    os.remove(f.path)
-    else:
-        os.makedirs(base_dir, exist_ok=True)
-
-def time_ms():
-    return int(time.time() * 1000)
-
-def run(mode="baseline", duration=30, num_nodes=6, stripes=200, logpath=LOGFILE, seed=42):
-    random_seed = seed
-    import random, numpy as np
-    random.seed(random_seed)
-    np.random.seed(random_seed)
-
-    base_dir = "./data_nodes"
-    clear_node_dirs(base_dir)
-
-    network = NetworkSimulator(base_ms=1.0, jitter_ms=0.5, bw_mbps=200.0, time_scale=0.002)
-    nodes = setup_nodes(base_dir, num_nodes, network)
-    controller = Controller(nodes, network)
-    workload = WorkloadGenerator(mode="zipf", stripes=stripes, zipf_s=1.2, hot_fraction=0.1)
-
-    predictor = HotStripePredictor(window_size=300, threshold=15)
-    energy_mgr = EnergyManager(nodes, low_power_node_ids=[n.id for n in nodes[-2:]])  # last 2 nodes low-power
-
-    # prepare log
-    with open(logpath, "w", newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["time_ms","mode","op","latency_ms","bytes","stripe","node_id","extra"])
-
-    start_ts = time.time()
-    ops = 0
-
-    try:
-        # steady stream of ops until duration reached
-        while time.time() - start_ts < duration:
-            op, stripe_id, data_index, data = workload.next_op()
-            ts0 = time.time()
-            bytes_len = len(data)
-            extra = ""
-            # if mode includes energy-aware and stripe is cold, place parity on low-power node
-            if mode == "baseline":
-                # baseline: central controller writes everything to node0 (simulate local RAID)
-                # For baseline we do central write (not distributed)
-                try:
-                    node = nodes[0]
-                    node.write_chunk(f"baseline_{stripe_id}_{data_index}", data)
-                    latency_ms = (time.time() - ts0) * 1000.0
-                    with open(logpath, "a") as csvfile:
-                        writer = csv.writer(csvfile)
-                        writer.writerow([time_ms(), mode, op, f"{latency_ms:.3f}", bytes_len, stripe_id, node.id, ""])
-                except Exception as e:
-                    with open(logpath, "a") as csvfile:
-                        writer = csv.writer(csvfile)
-                        writer.writerow([time_ms(), mode, op, "ERR", bytes_len, stripe_id, -1, str(e)])
+    # drop the whole tree in one call (node dirs are recreated by Node)
+    shutil.rmtree(base_dir, ignore_errors=True)
+    os.makedirs(base_dir, exist_ok=True)
+
+def p99(values):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(0.99 * len(values)))]
+
+def report_rebuild(job, fg_latency):
+    st = job.stats()
+    ttr = st["time_to_redundancy_s"]
+    print(f"[rebuild] rebuilt={st['rebuilt']}/{st['chunks']} skipped={st['skipped']} failed={st['failed']} "
+          f"throughput={st['throughput_MBps']:.2f} MB/s "
+          f"time_to_redundancy={'unfinished' if ttr is None else f'{ttr:.3f}s'}")
+    if st["source_nodes"]:
+        print(f"[rebuild] read from {st['source_nodes']} nodes, busiest served {st['max_source_share']:.1%} of reads")
+    before, during = p99(fg_latency["normal"]), p99(fg_latency["rebuild"])
+    print(f"[rebuild] foreground p99: {before:.3f} ms normal vs {during:.3f} ms during rebuild "
+          f"({len(fg_latency['rebuild'])} ops during rebuild)")
+
+def report_scrub(job, fg_latency):
+    st = job.stats()
+    took = st["scrub_time_s"]
+    print(f"[scrub] checked={st['checked']}/{st['stripes']} clean={st['clean']} repaired={st['repaired']} "
+          f"unreadable={st['unreadable']} throughput={st['throughput_MBps']:.2f} MB/s "
+          f"({st['stripes_per_s']:.0f} stripes/s) time={'unfinished' if took is None else f'{took:.3f}s'}")
+    before, during = p99(fg_latency["normal"]), p99(fg_latency["scrub"])
+    print(f"[scrub] foreground p99: {before:.3f} ms normal vs {during:.3f} ms during scrub "
+          f"({len(fg_latency['scrub'])} ops during scrub)")
+
+def report_rebalance(job, members):
+    st = job.stats()
+    took = st["rebalance_time_s"]
+    print(f"[rebalance] {len(members)} member nodes: migrated={st['migrated']}/{st['stripes']} stripes "
+          f"failed={st['failed']} moved={st['bytes_moved'] / 1e6:.2f} MB "
+          f"time={'unfinished' if took is None else f'{took:.3f}s'}")
+
+def report_energy(energy_mgr, ops):
+    power, total = energy_mgr.report()
+    for node_id, p in sorted(power.items()):
+        kind = "low-power" if node_id in energy_mgr.low_power_node_ids else "performance"
+        print(f"[energy] node {node_id} ({kind}): {p.joules:.2f} J active={p.active_s:.3f}s "
+              f"idle={p.idle_s:.3f}s standby={p.standby_s:.3f}s wakeups={p.wakeups}")
+    print(f"[energy] total={total:.2f} J, {total / max(ops, 1) * 1000.0:.3f} mJ/op")
+
+def summarize(latencies):
+    """mean/p50/p99 of the client op latencies (ms)."""
+    if not latencies:
+        return {"lat_mean_ms": float("nan"), "lat_p50_ms": float("nan"), "lat_p99_ms": float("nan")}
+    import numpy as np
+    lat = np.frombuffer(latencies, dtype=np.float64)
+    p50, p99_ = np.percentile(lat, [50, 99])
+    return {"lat_mean_ms": float(lat.mean()), "lat_p50_ms": float(p50), "lat_p99_ms": float(p99_)}
+
+RUN_DEFAULTS = dict(
+    mode="baseline", duration=30, num_nodes=6, stripes=200, logpath=LOGFILE, seed=42, max_ops=None,
+    clients=1, queue_depth=1, log_format=None, pattern="zipf", read_ratio=0.7, trace=None,
+    store="file", rebuild_node=None, rebuild_at=None, rebuild_workers=4, rebuild_bw=None,
+    fail_node=None, fail_at=None, recover_at=None, degraded_reads=True, write_blocks=1,
+    cache_mb=1.0, cache_policy="lru", cache_write="invalidate", cache_admit=4, low_power_nodes=None,
+    defer_batch=0, defer_delay=1.0,
+    predictor_kind="window", base_dir="./data_nodes", zipf_s=1.2, hot_fraction=0.1,
+    hot_window=300, hot_threshold=15, net_base_ms=1.0, net_jitter_ms=0.5, net_bw_mbps=200.0,
+    status=False, metrics_file=None, metrics_port=None, metrics=True, placement="roundrobin",
+    add_node_at=None, remove_node=None, remove_at=None, topology=None, journal=True, journal_ms=0.01,
+    resume=False, crash_at=None, scrub_at=None, scrub_batch=16, scrub_workers=1, scrub_bw=None,
+    verbose=True,
+)
+
+class Simulation:
+    """
+    One experiment configuration that can be run repeatedly in-process:
+
+        sim = Simulation(mode="draid", store="memory", logpath=None, max_ops=5000, verbose=False)
+        first = sim.run()
+        other = sim.run(seed=7)     # rebuilt in memory with one parameter changed
+
+    Parameters are those of run(). reset(**changes) rebuilds the cluster state (clock,
+    nodes, controller, workload, predictor, cache, energy, log) with the changed
+    parameters; run(**changes) resets first if the simulation has already run or
+    parameters change, and returns the summary dict. With store="memory" and
+    logpath=None a run touches no filesystem at all; verbose=False drops the console report.
+    """
+    def __init__(self, **params):
+        unknown = set(params) - set(RUN_DEFAULTS)
+        if unknown:
+            raise TypeError(f"unknown simulation parameters: {sorted(unknown)}")
+        self.cfg = types.SimpleNamespace(**{**RUN_DEFAULTS, **params})
+        self.summary = None
+        self._built = False
+        self.opened_nodes = []      # every Node built for the current run, closed by close_nodes()
+
+    def _say(self, text):
+        if self.cfg.verbose:
+            print(text)
+
+    def reset(self, **changes):
+        """Rebuild the whole simulation state (no I/O beyond clearing base_dir for on-disk stores)."""
+        unknown = set(changes) - set(RUN_DEFAULTS)
+        if unknown:
+            raise TypeError(f"unknown simulation parameters: {sorted(unknown)}")
+        for key, value in changes.items():
+            setattr(self.cfg, key, value)
+        cfg = self.cfg
+        self.close_nodes()      # a previous run's stores hold file descriptors (packed: fd + mapping)
+        import random, numpy as np
+        # imported here rather than at module level: both pull in numpy
+        from simulator.controller import Controller
+        from simulator.client import WorkloadGenerator, TraceWorkload
+        random.seed(cfg.seed)
+        np.random.seed(cfg.seed)
+
+        if cfg.store == "memory":
+            if cfg.resume:
+                raise ValueError("resume needs node data on disk (store 'file' or 'packed')")
+        elif cfg.resume:
+            os.makedirs(cfg.base_dir, exist_ok=True)
+        else:
+            clear_node_dirs(cfg.base_dir)
+        METRICS.reset()
+        METRICS.enabled = cfg.metrics
+
+        self.clock = clock = SimClock()
+        topology = cfg.topology
+        if isinstance(topology, str):
+            topology = Topology.load(topology)
+        elif isinstance(topology, dict):
+            topology = Topology.from_dict(topology)
+        self.topology = topology
+        self.network = NetworkSimulator(base_ms=cfg.net_base_ms, jitter_ms=cfg.net_jitter_ms,
+                                        bw_mbps=cfg.net_bw_mbps, clock=clock, topology=topology)
+        self.nodes = nodes = setup_nodes(cfg.base_dir, cfg.num_nodes, self.network, queue_depth=cfg.queue_depth,
+                                         store=cfg.store)
+        self.opened_nodes = list(nodes)
+        self.controller = controller = Controller(nodes, self.network, placement=cfg.placement)
+        if cfg.journal:
+            path = None if cfg.store == "memory" else os.path.join(cfg.base_dir, "journal.log")
+            controller.journal = IntentJournal(path, clock, latency_ms=cfg.journal_ms)
+        self.replayed = None
+        if cfg.resume:
+            found = controller.recover_from_nodes()
+            self._say(f"[resume] found {found} stripes on {len(nodes)} nodes")
+            if controller.journal is not None:
+                t_replay = clock.now
+                self.replayed = controller.replay_journal()
+                self._say(f"[resume] journal replay: {self.replayed or 'nothing to do'} "
+                          f"in {(clock.now - t_replay) * 1000:.3f} ms")
+        self.start_at = clock.now   # clients start once recovery is done
+        if cfg.trace:
+            self.workload = TraceWorkload(cfg.trace, seed=cfg.seed)
+        else:
+            self.workload = WorkloadGenerator(mode=cfg.pattern, stripes=cfg.stripes, zipf_s=cfg.zipf_s,
+                                              hot_fraction=cfg.hot_fraction, read_ratio=cfg.read_ratio, seed=cfg.seed)
+
+        self.predictor = make_predictor(cfg.predictor_kind, window_size=cfg.hot_window, threshold=cfg.hot_threshold)
+        self.cache = None
+        if cfg.mode == "draid_predict_energy" and cfg.cache_mb > 0:
+            # hot stripes are cached on node 0 (the fast node), bounded by cache_mb
+            self.cache = HotStripeCache(controller, nodes[0], int(cfg.cache_mb * 2**20), policy=cfg.cache_policy,
+                                        write_policy=cfg.cache_write, admit_reads=cfg.cache_admit)
+            controller.cache = self.cache
+        low_power_nodes = cfg.low_power_nodes
+        if low_power_nodes is None:
+            low_power_nodes = max(1, cfg.num_nodes - BLOCKS_PER_STRIPE - PARITY_BLOCKS)
+        self.energy_mgr = EnergyManager(nodes, low_power_node_ids=[n.id for n in nodes[len(nodes) - low_power_nodes:]])
+        for n in nodes:
+            self.energy_mgr.attach(n)
+        # energy-aware placement: stripes are placed at first write and promoted off low-power nodes once hot
+        self.place_by_energy = cfg.mode == "draid_predict_energy"
+        self.deferral = None
+        if self.place_by_energy and cfg.defer_batch:
+            # parity bound for low-power nodes is written in batches so they can spin down
+            self.deferral = ParityDeferral(controller, self.energy_mgr.low_power_node_ids, batch=cfg.defer_batch,
+                                           max_delay_s=cfg.defer_delay)
+            controller.deferral = self.deferral
+
+        # prepare log (one open handle, rows flushed in batches; logpath None keeps none)
+        self.logger = open_logger(cfg.logpath, cfg.log_format)
+        self.exporter = MetricsExporter(cfg.metrics_file, cfg.metrics_port) if (cfg.metrics_file or cfg.metrics_port) else None
+        self.status_line = None
+        if cfg.status or self.exporter is not None:
+            self.status_line = StatusLine(total=cfg.max_ops, every_ops=STATUS_EVERY, show=cfg.status,
+                                          exporter=self.exporter)
+
+        self.ops = 0
+        self.last_done = 0.0        # completion time of the last client op
+        self.rebuild = None
+        self.rebalance = None
+        self.scrub = None
+        self.crashed = False
+        # foreground latencies split by background job running (only kept with a rebuild or scrub)
+        self.fg_latency = None
+        if cfg.rebuild_node is not None or cfg.scrub_at is not None:
+            self.fg_latency = {"normal": [], "rebuild": [], "scrub": []}
+        self.latencies = array("d")     # every successful client op, for the returned summary
+        self.errors = 0
+        self.summary = None
+        self._built = True
+        return self
+
+    def time_ms(self):
+        return int(self.clock.now * 1000)
+
+    def log(self, op, latency_ms, bytes_len, stripe_id, node_id, extra):
+        self.logger.log(self.time_ms(), self.cfg.mode, op, latency_ms, bytes_len, stripe_id, node_id, extra)
+        if op in ("relocate", "migrate"):
+            return
+        METRICS.op(op, latency_ms)
+        if latency_ms is None:
+            self.errors += 1
+            return
+        self.latencies.append(latency_ms)
+        if self.fg_latency is not None:
+            if self.rebuild is not None and self.rebuild.active:
+                self.fg_latency["rebuild"].append(latency_ms)
+            elif self.scrub is not None and self.scrub.active:
+                self.fg_latency["scrub"].append(latency_ms)
             else:
-                # dRAID modes:
-                # if it's a write -> write full stripe (simulate writing all k blocks)
-                try:
-                    if op == "write":
-                        # create k blocks for stripe
-                        data_blocks = [os.urandom(4096) for _ in range(4)]
-                        # energy-aware: if mode includes 'energy' and stripe is cold, choose cold node
-                        if mode == "draid_predict_energy":
-                            # simple heuristics: if not hot (predictor says not hot) we store parity/cold on low-power
-                            if not predictor.is_hot(stripe_id):
-                                cold_node = energy_mgr.choose_cold_node(stripe_id)
-                                extra = f"cold_to_node{cold_node.id}"
-                        controller.write_stripe(stripe_id, data_blocks)
-                        latency_ms = (time.time() - ts0) * 1000.0
-                        with open(logpath, "a") as csvfile:
-                            writer = csv.writer(csvfile)
-                            writer.writerow([time_ms(), mode, "write_stripe", f"{latency_ms:.3f}", 4096*4, stripe_id, -1, extra])
-                        # predictor observe after write
-                        predictor.observe(stripe_id)
-                        # if stripe is hot and predictor marks hot and we're in mode==predict_energy, relocate
-                        if mode == "draid_predict_energy" and predictor.is_hot(stripe_id):
-                            # relocation: copy stripe to node0 (fast node) as cache
-                            # NOTE: for simplicity we pick node 0 as hot cache
-                            cache_node = nodes[0]
-                            # we will copy existing blocks from their nodes (simulate read + write)
-                            data_nodes, parity_nodes = controller.stripe_nodes(stripe_id)
-                            try:
-                                for i, n in enumerate(data_nodes):
-                                    b = n.read_chunk(f"stripe{stripe_id}_d{i}")
-                                    cache_node.write_chunk(f"stripe{stripe_id}_hot_d{i}", b)
-                                # Mark relocation mapping
-                                controller.relocations[stripe_id] = cache_node.id
-                                with open(logpath, "a") as csvfile:
-                                    writer = csv.writer(csvfile)
-                                    writer.writerow([time_ms(), mode, "relocate", 0, 0, stripe_id, cache_node.id, "relocated"])
-                            except Exception as e:
-                                # ignore relocation failures for this lightweight sim
-                                pass
-
-                    else:  # op == "read"
-                        # decide where to route read: if relocated present -> read from cache node
-                        if stripe_id in controller.relocations:
-                            cache_id = controller.relocations[stripe_id]
-                            node = next(n for n in nodes if n.id == cache_id)
-                            # read one block
-                            try:
-                                _ = node.read_chunk(f"stripe{stripe_id}_hot_d{data_index}")
-                                latency_ms = (time.time() - ts0)*1000.0
-                                with open(logpath, "a") as csvfile:
-                                    writer = csv.writer(csvfile)
-                                    writer.writerow([time_ms(), mode, "read_hot", f"{latency_ms:.3f}", 4096, stripe_id, node.id, "hit"])
-                                predictor.observe(stripe_id)
-                            except Exception:
-                                # fallback to dRAID read
-                                b = controller.read_block(stripe_id, data_index)
-                                latency_ms = (time.time() - ts0)*1000.0
-                                with open(logpath, "a") as csvfile:
-                                    writer = csv.writer(csvfile)
-                                    writer.writerow([time_ms(), mode, "read", f"{latency_ms:.3f}", 4096, stripe_id, -1, "fallback"])
-                                predictor.observe(stripe_id)
-                        else:
-                            # read from mapped node
-                            try:
-                                _ = controller.read_block(stripe_id, data_index)
-                                latency_ms = (time.time() - ts0)*1000.0
-                                with open(logpath, "a") as csvfile:
-                                    writer = csv.writer(csvfile)
-                                    writer.writerow([time_ms(), mode, "read", f"{latency_ms:.3f}", 4096, stripe_id, -1, ""])
-                                predictor.observe(stripe_id)
-                            except Exception as e:
-                                # simulate degraded read and recovery (not implemented fully)
-                                with open(logpath, "a") as csvfile:
-                                    writer = csv.writer(csvfile)
-                                    writer.writerow([time_ms(), mode, "read_err", "ERR", 0, stripe_id, -1, str(e)])
-                except Exception as e:
-                    with open(logpath, "a") as csvfile:
-                        writer = csv.writer(csvfile)
-                        writer.writerow([time_ms(), mode, "op_err", "ERR", 0, stripe_id, -1, str(e)])
-            ops += 1
-    except KeyboardInterrupt:
-        print("Interrupted.")
-    finally:
-        print(f"Finished. ops={ops}, log={logpath}")
+                self.fg_latency["normal"].append(latency_ms)
+
+    def _new_node(self):
+        cfg = self.cfg
+        node = Node(len(self.nodes), cfg.base_dir, self.network, queue_depth=cfg.queue_depth, store=cfg.store)
+        self.opened_nodes.append(node)
+        return node
+
+    def close_nodes(self):
+        """Close every node of the current run, including failed and replaced ones (idempotent)."""
+        for node in self.opened_nodes:
+            node.close()
+        self.opened_nodes = []
+
+    def start_rebuild(self):
+        cfg, controller = self.cfg, self.controller
+        replacement = self._new_node()
+        self.nodes.append(replacement)
+        if controller.nodes[cfg.rebuild_node].id in self.energy_mgr.low_power_node_ids:
+            self.energy_mgr.low_power_node_ids.add(replacement.id)
+            if self.deferral is not None:
+                self.deferral.node_ids.add(replacement.id)
+        if self.topology is not None:
+            self.topology.assign(replacement.id, self.topology.class_of(controller.nodes[cfg.rebuild_node].id).name)
+        self.energy_mgr.attach(replacement, self.clock.now)
+        self.rebuild = controller.degrade_and_recover(cfg.rebuild_node, replacement, workers=cfg.rebuild_workers,
+                                                      bandwidth_mbps=cfg.rebuild_bw)
+        self.rebuild.on_done = self.finish_rebuild
+        self._say(f"[rebuild] node {cfg.rebuild_node} failed at {self.clock.now:.3f}s, "
+                  f"rebuilding {self.rebuild.total} chunks onto node {replacement.id}")
+
+    def finish_rebuild(self, job):
+        st = job.stats()
+        self.logger.log(self.time_ms(), self.cfg.mode, "rebuild", st["time_to_redundancy_s"] * 1000.0,
+                        st["bytes_moved"], -1, job.replacement.id,
+                        f"chunks={st['rebuilt']};failed={st['failed']};MBps={st['throughput_MBps']:.2f}")
+
+    def start_scrub(self):
+        cfg = self.cfg
+        self.scrub = ScrubJob(self.controller, self.controller.scrub_order(), batch=cfg.scrub_batch,
+                              workers=cfg.scrub_workers, bandwidth_mbps=cfg.scrub_bw).start()
+        self.scrub.on_done = self.finish_scrub
+        self._say(f"[scrub] started at {self.clock.now:.3f}s over {self.scrub.stripes} stripes")
+
+    def finish_scrub(self, job):
+        st = job.stats()
+        self.logger.log(self.time_ms(), self.cfg.mode, "scrub", st["scrub_time_s"] * 1000.0, st["bytes_scanned"],
+                        -1, -1, f"checked={st['checked']};repaired={st['repaired']};"
+                                f"unreadable={st['unreadable']};MBps={st['throughput_MBps']:.2f}")
+
+    def crash_event(self):
+        self.controller.crash_pending = True
+        self._say(f"[crash] controller crash armed at {self.clock.now:.3f}s (tears the next stripe update)")
+
+    def start_rebalance(self, job, what):
+        self.rebalance = job
+        job.on_done = self.finish_rebalance
+        self._say(f"[rebalance] {what} at {self.clock.now:.3f}s, migrating {job.total} stripes")
+
+    def add_node_event(self):
+        cfg = self.cfg
+        new = self._new_node()
+        self.energy_mgr.attach(new, self.clock.now)
+        self.start_rebalance(self.controller.add_node(new, workers=cfg.rebuild_workers, bandwidth_mbps=cfg.rebuild_bw),
+                             f"node {new.id} added")
+
+    def remove_node_event(self):
+        cfg = self.cfg
+        job = self.controller.remove_node(cfg.remove_node, workers=cfg.rebuild_workers, bandwidth_mbps=cfg.rebuild_bw)
+        self.start_rebalance(job, f"node {self.controller.nodes[cfg.remove_node].id} removed")
+
+    def finish_rebalance(self, job):
+        st = job.stats()
+        self.logger.log(self.time_ms(), self.cfg.mode, "rebalance", st["rebalance_time_s"] * 1000.0,
+                        st["bytes_moved"], -1, -1,
+                        f"stripes={st['migrated']};failed={st['failed']};members={len(self.controller.members)}")
+
+    def log_cache_stats(self):
+        cache = self.cache
+        st = cache.stats()
+        self.logger.log(self.time_ms(), self.cfg.mode, "cache", 0, st["occupancy_bytes"], -1, cache.node.id,
+                        f"hits={st['hits']};misses={st['misses']};evictions={st['evictions']};"
+                        f"invalidations={st['invalidations']};occupancy={st['occupancy_bytes']}")
+
+    def draid_read(self, stripe_id, data_index):
+        # read from the mapped node; if that chunk is unavailable, decode it from the survivors
+        # returns (op, data, node_id) with node_id -1 for a decode from several nodes
+        controller = self.controller
+        try:
+            node = controller.stripe_nodes(stripe_id)[0][data_index]
+            return "read", controller.read_block(stripe_id, data_index), node.id
+        except Exception:
+            if not self.cfg.degraded_reads:
+                raise
+            return "read_degraded", controller.degraded_read(stripe_id, data_index), -1
+
+    def promote(self, stripe_id):
+        # a hot stripe still placed on low-power nodes moves to the performance nodes
+        positions = self.controller.placement.get(stripe_id)
+        if positions is None or not self.predictor.is_hot(stripe_id) or self.energy_mgr.is_hot_placement(positions):
+            return
+        t_mig = self.clock.now
+        try:
+            moved = self.controller.migrate_stripe(stripe_id, self.energy_mgr.place(stripe_id, True, len(positions)))
+            self.log("migrate", (self.clock.now - t_mig) * 1000.0, moved, stripe_id, -1, "to_performance")
+        except Exception:
+            pass    # retried on the next access
+
+    def admit(self, stripe_id):
+        # a read miss on a hot stripe admits it to the cache tier (copy read + write; may
+        # evict colder stripes). Writes never admit: under "invalidate" that would recopy
+        # the stripe the write just dropped
+        if self.cache.should_admit(stripe_id) and self.predictor.is_hot(stripe_id):
+            # the copy is filled in the background: the client does not wait for it
+            self.clock.schedule(self.clock.now, self.fill_cache, stripe_id)
+
+    def fill_cache(self, stripe_id):
+        cache = self.cache
+        if not cache.should_admit(stripe_id):
+            return      # admitted or written meanwhile
+        t_reloc = self.clock.now
+        try:
+            evicted = cache.admit(stripe_id)
+            self.log("relocate", (self.clock.now - t_reloc) * 1000.0, cache.entry_bytes, stripe_id,
+                     cache.node.id, f"evicted={len(evicted)}")
+        except Exception:
+            pass    # ignore relocation failures for this lightweight sim
+
+    def fail_event(self):
+        node = self.controller.nodes[self.cfg.fail_node]
+        node.fail()
+        self.logger.log(self.time_ms(), self.cfg.mode, "node_fail", 0, 0, -1, node.id, "")
+        self._say(f"[failure] node {self.cfg.fail_node} down at {self.clock.now:.3f}s")
+
+    def recover_event(self):
+        node = self.controller.nodes[self.cfg.fail_node]
+        node.recover()
+        self.logger.log(self.time_ms(), self.cfg.mode, "node_recover", 0, 0, -1, node.id, "")
+        self._say(f"[failure] node {self.cfg.fail_node} back at {self.clock.now:.3f}s")
+
+    def fail_op(self):
+        # a failed op still costs the round trip that discovered the failure
+        # (also keeps simulated time moving when every op is failing)
+        self.clock.sleep(self.network.base_ms / 1000.0)
+
+    def client_done(self):
+        # no more client ops: flush deferred parity now rather than max_delay_s later; stripes
+        # that still fail (lost data chunk) stay stale instead of being retried forever
+        if self.deferral is not None and self.controller.stale_parity:
+            self.deferral.flush(retry=False)
+
+    def client_step(self):
+        # one op per event; each client issues its next op when the previous one completes
+        cfg, clock, controller, predictor, cache = self.cfg, self.clock, self.controller, self.predictor, self.cache
+        if clock.now >= cfg.duration or (cfg.max_ops is not None and self.ops >= cfg.max_ops):
+            return self.client_done()
+        next_op = self.workload.next_op()
+        if next_op is None:
+            return self.client_done()      # trace exhausted
+        op, stripe_id, data_index, data = next_op
+        ts0 = clock.now
+        bytes_len = len(data)
+        extra = ""
+        # if mode includes energy-aware and stripe is cold, place parity on low-power node
+        if cfg.mode == "baseline":
+            # baseline: central controller writes everything to node0 (simulate local RAID)
+            # For baseline we do central write (not distributed)
+            try:
+                node = self.nodes[0]
+                node.write_chunk(f"baseline_{stripe_id}_{data_index}", data)
+                latency_ms = (clock.now - ts0) * 1000.0
+                self.log(op, latency_ms, bytes_len, stripe_id, node.id, "")
+            except Exception as e:
+                self.log(op, None, bytes_len, stripe_id, -1, str(e))
+        else:
+            # dRAID modes:
+            # a write covers write_blocks blocks from data_index; the controller picks
+            # read-modify-write, reconstruct-write or a full-stripe write
+            try:
+                if op == "write":
+                    start = min(data_index, BLOCKS_PER_STRIPE - cfg.write_blocks)
+                    data_blocks = [data] + self.workload.payload(cfg.write_blocks - 1)
+                    # energy-aware: a new stripe is placed by its predicted temperature,
+                    # cold ones grouped onto the low-power nodes
+                    if self.place_by_energy and not controller.is_written(stripe_id):
+                        hot = predictor.is_hot(stripe_id)
+                        controller.set_placement(stripe_id, self.energy_mgr.place(stripe_id, hot, BLOCKS_PER_STRIPE + PARITY_BLOCKS))
+                        extra = "placed_hot" if hot else "placed_cold"
+                    strategy, moved = controller.write_blocks(stripe_id, start, data_blocks)
+                    latency_ms = (clock.now - ts0) * 1000.0
+                    self.log(f"write_{strategy}", latency_ms, moved, stripe_id, -1, extra)
+                    # predictor observe after write
+                    predictor.observe(stripe_id)
+                    if self.place_by_energy:
+                        self.promote(stripe_id)
+
+                else:  # op == "read"
+                    # decide where to route read: if cached -> read from cache node
+                    if cache is not None and cache.lookup(stripe_id):
+                        node = cache.node
+                        # read one block
+                        try:
+                            _ = node.read_chunk(f"stripe{stripe_id}_hot_d{data_index}")
+                            latency_ms = (clock.now - ts0)*1000.0
+                            self.log("read_hot", latency_ms, 4096, stripe_id, node.id, "hit")
+                            predictor.observe(stripe_id)
+                        except Exception:
+                            # fallback to dRAID read
+                            read_op, _, node_id = self.draid_read(stripe_id, data_index)
+                            latency_ms = (clock.now - ts0)*1000.0
+                            self.log(read_op, latency_ms, 4096, stripe_id, node_id, "fallback")
+                            predictor.observe(stripe_id)
+                    else:
+                        # read from mapped node
+                        try:
+                            read_op, _, node_id = self.draid_read(stripe_id, data_index)
+                            latency_ms = (clock.now - ts0)*1000.0
+                            self.log(read_op, latency_ms, 4096, stripe_id, node_id, "")
+                            predictor.observe(stripe_id)
+                            if self.place_by_energy:
+                                self.promote(stripe_id)
+                            if cache is not None:
+                                self.admit(stripe_id)
+                        except Exception as e:
+                            # neither the chunk nor enough survivors to decode it
+                            self.fail_op()
+                            self.log("read_err", None, 0, stripe_id, -1, str(e))
+            except ControllerCrash:
+                raise   # ends the run (see run())
+            except Exception as e:
+                self.fail_op()
+                self.log("op_err", None, 0, stripe_id, -1, str(e))
+        self.ops += 1
+        self.last_done = max(self.last_done, clock.now)
+        if cache is not None and self.ops % CACHE_STATS_EVERY == 0:
+            self.log_cache_stats()
+        if self.status_line is not None:
+            self.status_line.update(self.ops, clock.now)
+        clock.schedule(clock.now, self.client_step)
+
+    def run(self, **changes):
+        """Run to completion (resetting first if needed) and return the summary dict."""
+        if changes or not self._built or self.summary is not None:
+            self.reset(**changes)
+        cfg, clock = self.cfg, self.clock
+        try:
+            # steady stream of ops from every client until the simulated duration is reached
+            for _ in range(cfg.clients):
+                clock.schedule(self.start_at, self.client_step)
+            if cfg.crash_at is not None:
+                clock.schedule(cfg.crash_at, self.crash_event)
+            if cfg.scrub_at is not None:
+                clock.schedule(max(cfg.scrub_at, self.start_at), self.start_scrub)
+            if cfg.rebuild_node is not None:
+                clock.schedule(cfg.rebuild_at or 0.0, self.start_rebuild)
+            if cfg.add_node_at is not None:
+                clock.schedule(cfg.add_node_at, self.add_node_event)
+            if cfg.remove_node is not None:
+                clock.schedule(cfg.remove_at or 0.0, self.remove_node_event)
+            if cfg.fail_node is not None:
+                clock.schedule(cfg.fail_at or 0.0, self.fail_event)
+                if cfg.recover_at is not None:
+                    clock.schedule(cfg.recover_at, self.recover_event)
+            clock.run()
+        except KeyboardInterrupt:
+            print("Interrupted.")
+        except ControllerCrash as e:
+            self.crashed = True
+            self.logger.log(self.time_ms(), cfg.mode, "crash", 0, 0, -1, -1, str(e))
+            self._say(f"[crash] {e} at {clock.now:.3f}s; rerun with --resume to replay the journal")
+        finally:
+            self._finish()
+        self.summary = self._summarize()
+        return self.summary
+
+    def _finish(self):
+        # closes the log/exporter and prints the console report
+        cfg, cache, ops, last_done = self.cfg, self.cache, self.ops, self.last_done
+        if cache is not None and ops % CACHE_STATS_EVERY:
+            self.log_cache_stats()
+        self.energy_mgr.finish(last_done)
+        power, self.total_j = self.energy_mgr.report()
+        for node_id, p in sorted(power.items()):
+            self.logger.log(self.time_ms(), cfg.mode, "energy", 0, p.bytes, -1, node_id,
+                            f"joules={p.joules:.4f};active_s={p.active_s:.4f};idle_s={p.idle_s:.4f};"
+                            f"standby_s={p.standby_s:.4f};wakeups={p.wakeups}")
+        self.logger.log(self.time_ms(), cfg.mode, "energy", 0, sum(p.bytes for p in power.values()), -1, -1,
+                        f"joules={self.total_j:.4f};J_per_op={self.total_j / max(ops, 1):.6f}")
+        self.logger.close()
+        if self.controller.journal is not None:
+            self.controller.journal.close()
+        self.close_nodes()
+        if self.status_line is not None:
+            self.status_line.close(ops)
+        if self.exporter is not None:
+            self.exporter.publish()
+            self.exporter.close()
+        if not cfg.verbose:
+            return
+        elapsed = max(last_done, 1e-9)
+        queue_wait_ms = sum(n.queue.wait_total for n in self.nodes) * 1000.0
+        print(f"Finished. ops={ops}, simulated={last_done:.3f}s, throughput={ops / elapsed:.1f} ops/s, "
+              f"node_queue_wait={queue_wait_ms:.1f}ms, log={cfg.logpath}")
+        if self.rebuild is not None:
+            report_rebuild(self.rebuild, self.fg_latency)
+        if self.rebalance is not None:
+            report_rebalance(self.rebalance, self.controller.members)
+        if self.scrub is not None:
+            report_scrub(self.scrub, self.fg_latency)
+        for line in self.network.report(last_done):
+            print(f"[network] {line}")
+        report_energy(self.energy_mgr, ops)
+        if self.deferral is not None:
+            st = self.deferral.stats()
+            print(f"[defer] deferred_writes={st['deferred_writes']} flushes={st['flushes']} "
+                  f"flushed_stripes={st['flushed_stripes']} still_stale={st['stale_stripes']} "
+                  f"moved={st['bytes_moved'] / 1e6:.2f} MB")
+        if METRICS.enabled:
+            print("[phases] per-phase time (sim = simulated, cpu = host):")
+            print(METRICS.report())
+        if cache is not None:
+            st = cache.stats()
+            print(f"[cache] {cfg.cache_policy}/{cfg.cache_write}: hit_ratio={st['hit_ratio']:.3f} hits={st['hits']} "
+                  f"misses={st['misses']} evictions={st['evictions']} invalidations={st['invalidations']} "
+                  f"occupancy={st['occupancy_bytes']}/{st['capacity_bytes']} bytes")
+
+    def _summarize(self):
+        ops, last_done, total_j = self.ops, self.last_done, self.total_j
+        summary = {"ops": ops, "errors": self.errors, "simulated_s": last_done,
+                   "throughput_ops": ops / max(last_done, 1e-9)}
+        summary.update(summarize(self.latencies))
+        summary["energy_j"] = total_j
+        summary["j_per_op"] = total_j / max(ops, 1)
+        summary["cache_hit_ratio"] = self.cache.stats()["hit_ratio"] if self.cache is not None else None
+        if self.deferral is not None:
+            summary["parity_flushes"] = self.deferral.flushes
+        if self.rebuild is not None:
+            summary["rebuild_time_to_redundancy_s"] = self.rebuild.stats()["time_to_redundancy_s"]
+        if self.crashed:
+            summary["crashed"] = True
+        if self.replayed is not None:
+            summary["replayed_stripes"] = sum(self.replayed.values())
+        if self.scrub is not None:
+            st = self.scrub.stats()
+            summary["scrub_repaired"] = st["repaired"]
+            summary["scrub_MBps"] = st["throughput_MBps"]
+        if self.rebalance is not None:
+            st = self.rebalance.stats()
+            summary["rebalance_bytes"] = st["bytes_moved"]
+            summary["rebalance_time_s"] = st["rebalance_time_s"]
+        return summary
+
+def run(**params):
+    """
+    Run one experiment on a virtual clock (a fresh Simulation) and return its summary.
+    duration is in simulated seconds; max_ops (if set) stops the run after that many ops.
+    clients closed-loop workers issue ops concurrently; each node services at most
+    queue_depth requests at a time and queues the rest.
+    logpath is the run log (None: keep no log); log_format is one of LOG_FORMATS
+    (default: from the log file extension, else csv).
+    pattern/read_ratio configure the WorkloadGenerator; trace replays a saved trace instead.
+    store picks the node chunk backend (see STORE_TYPES; "memory" needs no filesystem).
+    rebuild_node/rebuild_at fail that node at that simulated time and rebuild it onto a
+    fresh replacement with rebuild_workers concurrent chunk rebuilds, capped at rebuild_bw Mbit/s.
+    fail_node/fail_at/recover_at inject a transient node failure; while it lasts, reads of its
+    chunks are decoded from the survivors (degraded_reads) and stripe writes touching it fail.
+    write_blocks is the size of each dRAID write in blocks (1..k); bytes logged for writes
+    are the bytes actually moved, so small writes show their read-modify-write savings.
+    cache_mb/cache_policy/cache_write size the hot-stripe cache tier (draid_predict_energy only;
+    cache_mb=0 turns it off);
+    a hot stripe is copied in on a read miss after cache_admit reads without a write.
+    low_power_nodes is how many of the last nodes use the low-power (spin-down) profile; default
+    is the nodes a k + r stripe can leave out. Energy is accounted in every mode; in
+    draid_predict_energy stripes are also placed by it (cold ones grouped on low-power nodes).
+    defer_batch/defer_delay (draid_predict_energy, opt-in): parity updates bound for low-power
+    nodes are deferred and flushed once defer_batch stripes are stale or defer_delay simulated
+    seconds after the first (ParityDeferral); a stale stripe has no redundancy until then.
+    defer_batch=0 (default) writes parity immediately.
+    predictor_kind picks the hot-stripe predictor engine (see PREDICTORS); a stripe is hot
+    after hot_threshold accesses within (about) hot_window ops.
+    base_dir holds the node data (cleared first), so concurrent runs need distinct ones.
+    zipf_s/hot_fraction shape the Zipf workload; net_* configure the network model.
+    topology (a JSON file path, dict or Topology) replaces it with a contended rack model:
+    per-node speed classes, NICs and a shared uplink (net_base_ms still prices failed ops).
+    status shows a live tqdm status line; metrics_file/metrics_port publish the per-phase
+    timers and op counters in Prometheus text format (refreshed with the status line, every
+    STATUS_EVERY ops). metrics=False turns the instrumentation off.
+    placement picks the stripe placement engine (see PLACEMENTS). add_node_at joins a fresh
+    node at that simulated time; remove_node/remove_at drains that node position. Either
+    starts a background rebalance (rebuild_workers / rebuild_bw limits) that moves only the
+    chunks whose target node changed. In draid_predict_energy, stripes placed by energy
+    are moved to their engine target too if a rebalance runs.
+    journal brackets every dRAID stripe update with intent records in base_dir/journal.log
+    (each begin costs journal_ms). crash_at crashes the controller at that simulated time,
+    tearing the next stripe update after its data chunks and ending the run. resume keeps
+    base_dir, rebuilds the controller's index from the node data (same num_nodes/store) and
+    replays the journal, resyncing the parity of stripes left with open intents.
+    scrub_at starts one background scrub pass over the written stripes (open intents first),
+    scrub_batch stripes per step on scrub_workers workers, capped at scrub_bw Mbit/s.
+    verbose=False skips the console report.
+    Returns a summary dict (ops, throughput, latency percentiles, energy, cache/rebuild stats).
+    """
+    return Simulation(**params).run()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--mode", choices=["baseline","draid","draid_predict_energy"], default="draid")
-    parser.add_argument("--duration", type=int, default=20, help="seconds")
+    parser.add_argument("--duration", type=float, default=None, help="simulated seconds (default 20, unbounded with --ops)")
+    parser.add_argument("--ops", type=int, default=None, help="stop after this many ops")
+    parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--nodes", type=int, default=6)
     parser.add_argument("--stripes", type=int, default=200)
     parser.add_argument("--log", type=str, default=LOGFILE)
+    parser.add_argument("--no-log", action="store_true", help="keep no run log (summary and report only)")
+    parser.add_argument("--log-format", choices=LOG_FORMATS, default=None, help="default: from --log extension")
+    parser.add_argument("--workload", choices=["zipf", "random", "seq"], default="zipf")
+    parser.add_argument("--read-ratio", type=float, default=0.7)
+    parser.add_argument("--zipf-s", type=float, default=1.2, help="Zipf skew")
+    parser.add_argument("--hot-fraction", type=float, default=0.1)
+    parser.add_argument("--trace", type=str, default=None, help="replay a trace saved by experiments.workloads")
+    parser.add_argument("--store", choices=STORE_TYPES, default="file", help="node chunk storage backend")
+    parser.add_argument("--rebuild-node", type=int, default=None, help="fail this node and rebuild it")
+    parser.add_argument("--rebuild-at", type=float, default=0.0, help="simulated seconds")
+    parser.add_argument("--rebuild-workers", type=int, default=4, help="concurrent chunk rebuilds")
+    parser.add_argument("--rebuild-bw", type=float, default=None, help="rebuild bandwidth cap in Mbit/s")
+    parser.add_argument("--placement", choices=PLACEMENTS, default="roundrobin", help="stripe placement engine")
+    parser.add_argument("--add-node-at", type=float, default=None, help="join a new node at this simulated time")
+    parser.add_argument("--remove-node", type=int, default=None, help="drain this node position")
+    parser.add_argument("--remove-at", type=float, default=0.0, help="simulated seconds")
+    parser.add_argument("--no-journal", action="store_true", help="no write-ahead intent journal")
+    parser.add_argument("--journal-ms", type=float, default=0.01, help="simulated cost of a journal append")
+    parser.add_argument("--crash-at", type=float, default=None, help="crash the controller mid-update at this time")
+    parser.add_argument("--resume", action="store_true", help="reuse --data-dir and replay the journal")
+    parser.add_argument("--scrub-at", type=float, default=None, help="start a background parity scrub pass")
+    parser.add_argument("--scrub-batch", type=int, default=16, help="stripes per scrub step")
+    parser.add_argument("--scrub-workers", type=int, default=1)
+    parser.add_argument("--scrub-bw", type=float, default=None, help="scrub bandwidth cap in Mbit/s")
+    parser.add_argument("--fail-node", type=int, default=None, help="take this node down (transient failure)")
+    parser.add_argument("--fail-at", type=float, default=0.0, help="simulated seconds")
+    parser.add_argument("--recover-at", type=float, default=None, help="simulated seconds (default: stays down)")
+    parser.add_argument("--no-degraded-reads", action="store_true", help="fail reads of unavailable chunks instead of decoding them")
+    parser.add_argument("--write-blocks", type=int, default=1, help=f"blocks per write (1..{BLOCKS_PER_STRIPE})")
+    parser.add_argument("--cache-mb", type=float, default=1.0, help="hot-stripe cache capacity (MiB, 0: no cache tier)")
+    parser.add_argument("--cache-policy", choices=sorted(CACHE_POLICIES), default="lru")
+    parser.add_argument("--cache-write", choices=WRITE_POLICIES, default="invalidate",
+                        help="on writes to a cached stripe: drop the copy or update it")
+    parser.add_argument("--cache-admit", type=int, default=4,
+                        help="reads without a write before a hot stripe is copied into the cache")
+    parser.add_argument("--defer-batch", type=int, default=0,
+                        help="defer parity bound for low-power nodes and flush it once this many stripes are "
+                             "stale (0: no deferral). WARNING: a stale stripe has no redundancy until flushed")
+    parser.add_argument("--defer-delay", type=float, default=1.0,
+                        help="longest a parity update to a low-power node is deferred (simulated seconds)")
+    parser.add_argument("--predictor", choices=sorted(PREDICTORS), default="window",
+                        help="hot-stripe predictor engine (sgd needs scikit-learn)")
+    parser.add_argument("--hot-window", type=int, default=300, help="predictor window (ops)")
+    parser.add_argument("--hot-threshold", type=float, default=15, help="accesses per window that make a stripe hot")
+    parser.add_argument("--net-base-ms", type=float, default=1.0)
+    parser.add_argument("--net-jitter-ms", type=float, default=0.5)
+    parser.add_argument("--net-bw", type=float, default=200.0, help="network bandwidth in Mbit/s")
+    parser.add_argument("--topology", type=str, default=None,
+                        help="JSON rack topology (speed classes, NICs, shared uplink); replaces --net-*")
+    parser.add_argument("--data-dir", type=str, default="./data_nodes", help="node data directory (cleared first)")
+    parser.add_argument("--low-power-nodes", type=int, default=None,
+                        help="number of trailing nodes with the low-power (spin-down) profile")
+    parser.add_argument("--status", action="store_true", help="live tqdm status line (rolling ops/s, p50/p99)")
+    parser.add_argument("--metrics-file", type=str, default=None, help="write Prometheus text metrics here")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    parser.add_argument("--no-metrics", action="store_true", help="turn off per-phase instrumentation")
+    parser.add_argument("--clients", type=int, default=1, help="concurrent closed-loop clients")
+    parser.add_argument("--queue-depth", type=int, default=1, help="requests each node services at once")
     args = parser.parse_args()
-    run(mode=args.mode, duration=args.duration, num_nodes=args.nodes, stripes=args.stripes, logpath=args.log)
+    if not 1 <= args.write_blocks <= BLOCKS_PER_STRIPE:
+        parser.error(f"--write-blocks must be between 1 and {BLOCKS_PER_STRIPE}")
+    if args.duration is None:
+        args.duration = float("inf") if args.ops is not None else 20
+    run(mode=args.mode, duration=args.duration, num_nodes=args.nodes, stripes=args.stripes,
+        logpath=None if args.no_log else args.log, seed=args.seed, max_ops=args.ops, clients=args.clients,
+        queue_depth=args.queue_depth, log_format=args.log_format, pattern=args.workload, read_ratio=args.read_ratio,
+        trace=args.trace, store=args.store, rebuild_node=args.rebuild_node, rebuild_at=args.rebuild_at,
+        rebuild_workers=args.rebuild_workers, rebuild_bw=args.rebuild_bw,
+        fail_node=args.fail_node, fail_at=args.fail_at, recover_at=args.recover_at,
+        degraded_reads=not args.no_degraded_reads, write_blocks=args.write_blocks,
+        cache_mb=args.cache_mb, cache_policy=args.cache_policy, cache_write=args.cache_write,
+        cache_admit=args.cache_admit, defer_batch=args.defer_batch, defer_delay=args.defer_delay,
+        low_power_nodes=args.low_power_nodes, predictor_kind=args.predictor,
+        base_dir=args.data_dir, zipf_s=args.zipf_s, hot_fraction=args.hot_fraction, hot_window=args.hot_window,
+        hot_threshold=args.hot_threshold, net_base_ms=args.net_base_ms, net_jitter_ms=args.net_jitter_ms,
+        net_bw_mbps=args.net_bw, status=args.status, metrics_file=args.metrics_file,
+        metrics_port=args.metrics_port, metrics=not args.no_metrics, placement=args.placement,
+        add_node_at=args.add_node_at, remove_node=args.remove_node, remove_at=args.remove_at,
+        topology=args.topology, journal=not args.no_journal, journal_ms=args.journal_ms, resume=args.resume,
+        crash_at=args.crash_at, scrub_at=args.scrub_at, scrub_batch=args.scrub_batch,
+        scrub_workers=args.scrub_workers, scrub_bw=args.scrub_bw)
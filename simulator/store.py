@@ -0,0 +1,181 @@
+# store.py
+import mmap
+import os
+import struct
+from pathlib import Path
+from simulator.constants import BLOCK_SIZE
+
+STORE_TYPES = ["file", "packed", "memory"]
+
+class MemoryChunkStore:
+    """Chunks in a dict (chunk_id -> bytes): no filesystem at all, gone with the process."""
+    def __init__(self):
+        self.chunks = {}
+
+    def exists(self, chunk_id):
+        return chunk_id in self.chunks
+
+    def write(self, chunk_id, data):
+        self.chunks[chunk_id] = bytes(data)
+
+    def read(self, chunk_id):
+        try:
+            return self.chunks[chunk_id]
+        except KeyError:
+            raise FileNotFoundError(chunk_id) from None
+
+    def delete(self, chunk_id):
+        self.chunks.pop(chunk_id, None)
+
+    def list(self):
+        return list(self.chunks)
+
+    def close(self):
+        pass    # nothing held outside the dict
+
+class FileChunkStore:
+    """One file per chunk: <base_dir>/<chunk_id>.chk (the original layout)."""
+    def __init__(self, base_dir):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, chunk_id):
+        return self.base_dir / f"{chunk_id}.chk"
+
+    def exists(self, chunk_id):
+        return self.path(chunk_id).exists()
+
+    def write(self, chunk_id, data):
+        with open(self.path(chunk_id), "wb") as f:
+            f.write(data)
+
+    def read(self, chunk_id):
+        with open(self.path(chunk_id), "rb") as f:
+            return f.read()
+
+    def delete(self, chunk_id):
+        p = self.path(chunk_id)
+        if p.exists():
+            p.unlink()
+
+    def list(self):
+        return [f.stem for f in self.base_dir.glob("*.chk")]
+
+    def close(self):
+        pass    # every read/write opens and closes its own file
+
+# slot header: chunk id length (u16), payload length (u32), chunk id bytes
+_HEADER = struct.Struct("<HI")
+HEADER_SIZE = 64
+MAX_ID_LEN = HEADER_SIZE - _HEADER.size
+
+class PackedChunkStore:
+    """
+    All chunks of a node in one preallocated data file of fixed-size slots
+    (64-byte header + slot_size payload) plus an in-memory chunk_id -> slot index.
+    Rewrites go to the chunk's existing slot; freed slots are reused.
+
+    Reads copy the chunk out of an mmap of the file (no syscalls), so what they
+    return does not change when the chunk is rewritten. The headers let the
+    index be rebuilt by scanning the file when an existing store is reopened.
+    close() releases the file descriptor and the mapping.
+    """
+    FILENAME = "chunks.dat"
+
+    def __init__(self, base_dir, slot_size=BLOCK_SIZE, capacity=1024):
+        Path(base_dir).mkdir(parents=True, exist_ok=True)
+        self.path = Path(base_dir) / self.FILENAME
+        self.slot_size = slot_size
+        self.stride = HEADER_SIZE + slot_size
+        self.index = {}             # chunk_id -> slot number
+        self.free = []              # reusable slot numbers
+        self.used = 0               # high-water mark of slots ever handed out
+        fresh = not self.path.exists()
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self.fd).st_size
+        self.capacity = max(capacity, size // self.stride)
+        if self.capacity * self.stride > size:
+            os.ftruncate(self.fd, self.capacity * self.stride)
+        self.mm = mmap.mmap(self.fd, self.capacity * self.stride)
+        if not fresh:
+            self._load_index()
+
+    def _load_index(self):
+        import numpy as np
+        headers = np.frombuffer(self.mm, dtype=np.uint8).reshape(self.capacity, self.stride)[:, :HEADER_SIZE]
+        id_lens = headers[:, :2].copy().view("<u2")[:, 0]
+        for slot in np.flatnonzero(id_lens):
+            off = int(slot) * self.stride
+            id_len, _ = _HEADER.unpack_from(self.mm, off)
+            chunk_id = bytes(self.mm[off + _HEADER.size:off + _HEADER.size + id_len]).decode()
+            self.index[chunk_id] = int(slot)
+        self.used = max(self.index.values()) + 1 if self.index else 0
+        self.free = [s for s in range(self.used) if id_lens[s] == 0]
+        del headers     # release the numpy export of the mapping
+
+    def _grow(self):
+        # remap at double size (reads hand out copies, so nothing still points into the old map)
+        self.mm.close()
+        self.capacity *= 2
+        os.ftruncate(self.fd, self.capacity * self.stride)
+        self.mm = mmap.mmap(self.fd, self.capacity * self.stride)
+
+    def _alloc(self):
+        if self.free:
+            return self.free.pop()
+        if self.used == self.capacity:
+            self._grow()
+        self.used += 1
+        return self.used - 1
+
+    def exists(self, chunk_id):
+        return chunk_id in self.index
+
+    def write(self, chunk_id, data):
+        if len(data) > self.slot_size:
+            raise ValueError(f"chunk {chunk_id} is {len(data)} bytes, slot size is {self.slot_size}")
+        key = chunk_id.encode()
+        if len(key) > MAX_ID_LEN:
+            raise ValueError(f"chunk id too long for packed store: {chunk_id}")
+        slot = self.index.get(chunk_id)
+        if slot is None:
+            slot = self.index[chunk_id] = self._alloc()
+        off = slot * self.stride
+        _HEADER.pack_into(self.mm, off, len(key), len(data))
+        self.mm[off + _HEADER.size:off + _HEADER.size + len(key)] = key
+        self.mm[off + HEADER_SIZE:off + HEADER_SIZE + len(data)] = data
+
+    def read(self, chunk_id):
+        slot = self.index.get(chunk_id)
+        if slot is None:
+            raise FileNotFoundError(chunk_id)
+        off = slot * self.stride
+        _, length = _HEADER.unpack_from(self.mm, off)
+        return self.mm[off + HEADER_SIZE:off + HEADER_SIZE + length]
+
+    def delete(self, chunk_id):
+        slot = self.index.pop(chunk_id, None)
+        if slot is not None:
+            _HEADER.pack_into(self.mm, slot * self.stride, 0, 0)
+            self.free.append(slot)
+
+    def list(self):
+        return list(self.index)
+
+    def close(self):
+        """Release the mapping and the file descriptor (the store is unusable afterwards)."""
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def make_store(kind, base_dir):
+    if kind == "file":
+        return FileChunkStore(base_dir)
+    if kind == "packed":
+        return PackedChunkStore(base_dir)
+    if kind == "memory":
+        return MemoryChunkStore()
+    raise ValueError(f"unknown store type: {kind}")
@@ -0,0 +1,102 @@
+# sweep.py
+"""
+Parameter sweep: run every point of a grid (mode x nodes x stripes x zipf_s x
+threshold x seed) with run_experiment.run(), one process per point, each with
+its own data directory and log, and merge the summaries into one CSV.
+
+    python -m simulator.sweep --modes draid draid_predict_energy --nodes 6 8 \\
+        --zipf-s 1.0 1.2 --threshold 10 15 --seeds 1 2 3 --ops 5000 --workers 8
+"""
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from simulator.run_experiment import run
+
+GRID_KEYS = ("mode", "num_nodes", "stripes", "zipf_s", "hot_threshold", "seed")
+
+def grid(modes, nodes, stripes, zipf_s, thresholds, seeds):
+    """All grid points as run() keyword dicts, in a stable order."""
+    return [dict(zip(GRID_KEYS, values))
+            for values in itertools.product(modes, nodes, stripes, zipf_s, thresholds, seeds)]
+
+def run_point(index, point, common, root, keep_data=False):
+    """Run one grid point in an isolated directory; returns its summary row (never raises)."""
+    point_dir = os.path.join(root, f"point_{index:04d}")
+    os.makedirs(point_dir, exist_ok=True)
+    row = {"point": index, **point}
+    t0 = time.perf_counter()
+    try:
+        # the per-run console report goes to the point's own file, not the shared terminal
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            summary = run(logpath=os.path.join(point_dir, "log.csv"),
+                          base_dir=os.path.join(point_dir, "data_nodes"), **point, **common)
+        with open(os.path.join(point_dir, "stdout.txt"), "w") as f:
+            f.write(out.getvalue())
+        row.update(summary)
+        row["error"] = ""
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if not keep_data:
+            shutil.rmtree(os.path.join(point_dir, "data_nodes"), ignore_errors=True)
+    row["wall_s"] = time.perf_counter() - t0
+    return row
+
+def sweep(points, common, root="./sweep_runs", workers=None, out="sweep_summary.csv", keep_data=False):
+    """Run points on a process pool and write the merged summary CSV; returns the rows."""
+    os.makedirs(root, exist_ok=True)
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_point, i, p, common, root, keep_data) for i, p in enumerate(points)]
+        for done, fut in enumerate(as_completed(futures), 1):
+            row = fut.result()
+            rows.append(row)
+            status = row["error"] or f"{row['throughput_ops']:.0f} ops/s p99={row['lat_p99_ms']:.2f}ms"
+            print(f"[{done}/{len(points)}] point {row['point']}: "
+                  + " ".join(f"{k}={row[k]}" for k in GRID_KEYS) + f" -> {status}")
+    rows.sort(key=lambda r: r["point"])
+    columns = []
+    for r in rows:
+        columns += [k for k in r if k not in columns]
+    with open(out, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["baseline", "draid", "draid_predict_energy"])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[6])
+    parser.add_argument("--stripes", type=int, nargs="+", default=[200])
+    parser.add_argument("--zipf-s", type=float, nargs="+", default=[1.2])
+    parser.add_argument("--threshold", type=float, nargs="+", default=[15], help="predictor hot threshold")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[42])
+    parser.add_argument("--ops", type=int, default=5000, help="ops per point")
+    parser.add_argument("--duration", type=float, default=float("inf"), help="simulated seconds per point")
+    parser.add_argument("--store", default="file")
+    parser.add_argument("--predictor", default="window")
+    parser.add_argument("--placement", default="roundrobin")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--root", default="./sweep_runs", help="per-point directories go here")
+    parser.add_argument("--out", default="sweep_summary.csv")
+    parser.add_argument("--keep-data", action="store_true", help="keep each point's node data")
+    args = parser.parse_args()
+
+    points = grid(args.modes, args.nodes, args.stripes, args.zipf_s, args.threshold, args.seeds)
+    common = {"max_ops": args.ops, "duration": args.duration, "store": args.store,
+              "predictor_kind": args.predictor, "placement": args.placement}
+    t0 = time.perf_counter()
+    rows = sweep(points, common, root=args.root, workers=args.workers, out=args.out, keep_data=args.keep_data)
+    failed = sum(1 for r in rows if r["error"])
+    print(f"{len(rows)} points ({failed} failed) in {time.perf_counter() - t0:.1f}s -> {args.out}")
+
+if __name__ == "__main__":
+    main()
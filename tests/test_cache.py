@@ -0,0 +1,50 @@
+# test_cache.py
+from simulator.clock import SimClock
+from simulator.network import NetworkSimulator
+from simulator.node import Node
+from simulator.controller import Controller
+from simulator.cache import HotStripeCache, LRUPolicy, LFUPolicy, ARCPolicy
+from simulator.constants import BLOCK_SIZE, BLOCKS_PER_STRIPE, PARITY_BLOCKS
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUPolicy(2)
+    lru.insert("a")
+    lru.insert("b")
+    lru.touch("a")
+    assert lru.insert("c") == ["b"]
+    assert lru.insert("d") == ["a"]
+
+def test_lfu_evicts_least_frequently_used():
+    lfu = LFUPolicy(2)
+    lfu.insert("a")
+    lfu.insert("b")
+    lfu.touch("a")
+    lfu.touch("a")
+    lfu.touch("b")
+    assert lfu.insert("c") == ["b"]
+    assert lfu.insert("d") == ["c"]     # the new entry has the lowest count
+
+def test_arc_evicts_recency_list_first_and_adapts_on_ghost_hit():
+    arc = ARCPolicy(2)
+    arc.insert("a")
+    arc.insert("b")
+    arc.touch("a")                      # a moves to the frequency list
+    assert arc.insert("c") == ["b"]     # b goes to the recency ghost list
+    assert arc.insert("b") == ["a"]     # ghost hit grows the recency target
+    assert arc.p == 1 and "b" in arc.t2
+
+def test_write_invalidates_cached_stripe():
+    clock = SimClock()
+    network = NetworkSimulator(jitter_ms=0.0, clock=clock)
+    nodes = [Node(i, "unused", network, store="memory") for i in range(BLOCKS_PER_STRIPE + PARITY_BLOCKS + 1)]
+    controller = Controller(nodes, network)
+    cache = controller.cache = HotStripeCache(controller, nodes[0], BLOCKS_PER_STRIPE * BLOCK_SIZE)
+    controller.write_stripe(0, [bytes([1]) * BLOCK_SIZE] * BLOCKS_PER_STRIPE)
+    cache.admit(0)
+    assert 0 in cache and nodes[0].store.exists("stripe0_hot_d0")
+    new = bytes([2]) * BLOCK_SIZE
+    controller.write_blocks(0, 0, [new])
+    clock.run()
+    assert 0 not in cache and not nodes[0].store.exists("stripe0_hot_d0")
+    assert cache.invalidations == 1
+    assert controller.read_block(0, 0) == new
@@ -0,0 +1,43 @@
+# test_clock.py
+from simulator.clock import SimClock, SimResource
+from simulator.network import NetworkSimulator
+from simulator.node import Node
+
+def busy(clock, res, at, service):
+    clock.now = at
+    with res.hold(service):
+        clock.now += service
+
+def test_earlier_op_uses_gap_before_future_reservation():
+    clock = SimClock()
+    res = SimResource(clock)
+    busy(clock, res, 0.0, 0.001)
+    busy(clock, res, 0.011, 0.001)      # reserved first, at a later simulated time
+    busy(clock, res, 0.002, 0.001)
+    assert clock.now == 0.003
+    assert res.wait_total == 0.0
+
+def test_gap_shorter_than_service_is_skipped():
+    clock = SimClock()
+    res = SimResource(clock)
+    busy(clock, res, 0.011, 0.001)
+    busy(clock, res, 0.0105, 0.001)
+    assert abs(clock.now - 0.013) < 1e-12
+    assert abs(res.wait_total - 0.0015) < 1e-12
+
+def test_capacity_slots():
+    clock = SimClock()
+    res = SimResource(clock, capacity=2)
+    for _ in range(3):
+        busy(clock, res, 0.0, 0.001)
+    assert clock.now == 0.002
+
+def test_node_io_backfills_idle_queue():
+    clock = SimClock()
+    node = Node(0, "unused", NetworkSimulator(jitter_ms=0.0, clock=clock), store="memory")
+    clock.now = 0.010
+    node.write_chunk("a", b"x" * 4096)
+    clock.now = 0.002
+    node.write_chunk("b", b"x" * 4096)
+    assert node.queue.wait_total == 0.0
+    assert clock.now < 0.010
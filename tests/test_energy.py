@@ -0,0 +1,80 @@
+# test_energy.py
+from simulator.clock import SimClock
+from simulator.network import NetworkSimulator
+from simulator.node import Node
+from simulator.controller import Controller
+from simulator.energy_manager import EnergyManager, NodePower, ParityDeferral, LOW_POWER_PROFILE
+from simulator.parity import xor_parity
+from simulator.constants import BLOCK_SIZE, BLOCKS_PER_STRIPE, PARITY_BLOCKS
+
+WIDTH = BLOCKS_PER_STRIPE + PARITY_BLOCKS
+
+def cluster(n=WIDTH + 1):
+    clock = SimClock()
+    network = NetworkSimulator(jitter_ms=0.0, clock=clock)
+    nodes = [Node(i, "unused", network, store="memory") for i in range(n)]
+    controller = Controller(nodes, network)
+    energy = EnergyManager(nodes, low_power_node_ids=[n - 1])
+    for node in nodes:
+        energy.attach(node)
+    return clock, nodes, controller, energy
+
+def test_cold_placement_confines_low_power_nodes():
+    _, nodes, _, energy = cluster(WIDTH + 2)
+    energy.low_power_node_ids = {nodes[-2].id, nodes[-1].id}
+    used = {i for sid in range(20) for i in energy.place(sid, False, WIDTH)}
+    assert len(nodes) - 1 not in used      # only PARITY_BLOCKS low-power nodes take cold stripes
+
+def test_deferred_parity_flushes_in_batch():
+    clock, nodes, controller, energy = cluster()
+    deferral = controller.deferral = ParityDeferral(controller, energy.low_power_node_ids, batch=2)
+    blocks = [bytes([i + 1]) * BLOCK_SIZE for i in range(BLOCKS_PER_STRIPE)]
+    for sid in range(2):
+        controller.set_placement(sid, energy.place(sid, False, WIDTH))
+        controller.write_stripe(sid, blocks)
+        if sid == 0:
+            assert controller.stale_parity == {0}
+            assert not nodes[-1].store.exists("stripe0_p0")
+    clock.run()
+    assert deferral.flushes == 1 and not controller.stale_parity
+    assert nodes[-1].read_chunk("stripe1_p0") == xor_parity(blocks)
+
+def test_final_flush_does_not_retry_lost_stripes():
+    clock, nodes, controller, energy = cluster()
+    deferral = controller.deferral = ParityDeferral(controller, energy.low_power_node_ids)
+    controller.set_placement(0, energy.place(0, False, WIDTH))
+    controller.write_stripe(0, [bytes(BLOCK_SIZE)] * BLOCKS_PER_STRIPE)
+    nodes[controller.placement[0][0]].fail()
+    assert deferral.flush(retry=False) == 0
+    clock.run()     # returns: nothing rescheduled
+    assert controller.stale_parity == {0}
+
+def test_energy_placement_leaves_written_stripes_alone_during_rebuild():
+    from simulator.run_experiment import Simulation
+    sim = Simulation(mode="draid_predict_energy", store="memory", logpath=None, verbose=False, clients=4,
+                     max_ops=3000, duration=float("inf"), rebuild_node=5, rebuild_at=0.3, rebuild_bw=5.0,
+                     seed=1)
+    sim.reset()
+    controller = sim.controller
+    place, placed, again = controller.set_placement, set(), []
+
+    def set_placement(stripe_id, positions):
+        if stripe_id in placed:
+            again.append(stripe_id)     # (an assert here would be swallowed as a failed op)
+        placed.add(stripe_id)
+        place(stripe_id, positions)
+    controller.set_placement = set_placement
+    sim.run()
+    assert again == []                  # a written stripe is never placed again
+    assert sim.rebuild.failed == 0
+    assert all(controller.scrub_stripe(s)[0] == "clean" for s in sorted(placed))
+
+def test_backfilled_io_is_charged_in_full():
+    power = NodePower(LOW_POWER_PROFILE)
+    power.end_io(1.0, 1.2, 0)
+    power.end_io(0.5, 0.6, 0)       # lands in the idle gap before the first I/O
+    power.end_io(1.1, 1.3, 0)       # overlaps it: only the extra 0.1 s is busy
+    power.finish(1.5)
+    assert abs(power.active_s - 0.4) < 1e-9
+    assert power.wakeups == 2       # I/O after the gaps 0-0.5 and 0.6-1.0 woke the node
+    assert abs(power.idle_s + power.standby_s - 1.1) < 1e-9
@@ -0,0 +1,24 @@
+# test_metrics.py
+from simulator.metrics import METRICS, PhaseStats
+from simulator.parity import rs_encode, xor_parity
+
+def counts():
+    out = {}
+    for name, st in METRICS.phases.items():
+        st.flush()
+        out[name] = st.count
+    return out
+
+def test_encode_does_not_count_nested_xor():
+    METRICS.reset()
+    rs_encode([bytes(64)] * 4, 2)
+    assert counts()["parity_encode"] == 1
+    assert counts()["parity_xor"] == 0
+    xor_parity([bytes(64)] * 4)
+    assert counts()["parity_xor"] == 1
+
+def test_sampled_phase_scales_count_and_total():
+    st = PhaseStats("cpu", every=8)
+    st.observe(0.5)
+    st.flush()
+    assert st.count == 8 and st.total == 4.0
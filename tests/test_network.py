@@ -0,0 +1,35 @@
+# test_network.py
+from simulator.clock import SimClock
+from simulator.network import NetworkSimulator, Topology
+
+TOPOLOGY = {"uplink_mbps": 100, "jitter": {"dist": "uniform"},
+            "classes": {"std": {"nic_mbps": 100, "base_ms": 1.0, "jitter_ms": 0.0}}}
+
+def make_network():
+    clock = SimClock()
+    return clock, NetworkSimulator(clock=clock, topology=Topology.from_dict(TOPOLOGY))
+
+def test_idle_link_gives_no_wait():
+    clock, net = make_network()
+    for i in range(5):
+        clock.now = i * 0.01        # far apart: the links are idle at every start
+        net.simulate_send(4096, 0)
+    assert all(link.wait_s == 0.0 for link in net.topology.links())
+
+def test_earlier_transfer_uses_gap_before_later_reservation():
+    clock, net = make_network()
+    clock.now = 0.005
+    net.simulate_send(4096, 0)      # reserved first, at a later simulated time
+    clock.now = 0.0001
+    net.simulate_send(4096, 0)
+    serialize = 4096 * 8 / 100e6
+    assert clock.now == 0.0001 + serialize + 0.001
+    assert net.topology.uplink.wait_s == 0.0
+
+def test_saturated_link_queues():
+    clock, net = make_network()
+    for _ in range(3):
+        clock.now = 0.0
+        net.simulate_send(125_000, 0)   # 10 ms each on a 100 Mbit/s link
+    assert abs(clock.now - (0.030 + 0.001)) < 1e-12
+    assert abs(net.topology.uplink.wait_s - (0.010 + 0.020)) < 1e-12
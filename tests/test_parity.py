@@ -0,0 +1,35 @@
+# test_parity.py
+import random
+from itertools import combinations
+import pytest
+from simulator.parity import rs_delta, rs_encode, rs_reconstruct, xor_parity
+
+CODES = [(4, 1), (4, 2), (4, 3), (6, 3), (10, 4)]
+
+def stripe(k, length=64, seed=0):
+    rng = random.Random(seed)
+    return [bytes(rng.randrange(256) for _ in range(length)) for _ in range(k)]
+
+@pytest.mark.parametrize("k,r", CODES)
+def test_every_erasure_pattern_round_trips(k, r):
+    data = stripe(k)
+    chunks = dict(enumerate(data + rs_encode(data, r)))
+    for lost in range(1, r + 1):
+        for missing in combinations(range(k + r), lost):
+            survivors = {i: c for i, c in chunks.items() if i not in missing}
+            assert rs_reconstruct(survivors, k, r, list(missing)) == {i: chunks[i] for i in missing}
+
+@pytest.mark.parametrize("k,r", CODES)
+def test_delta_update_matches_full_encode(k, r):
+    data = stripe(k)
+    parity = rs_encode(data, r)
+    for i in range(k):
+        new = stripe(1, seed=i + 1)[0]
+        parity = rs_delta(parity, i, data[i], new, k)
+        data[i] = new
+        assert parity == rs_encode(data, r)
+
+@pytest.mark.parametrize("k,r", CODES)
+def test_first_parity_is_xor(k, r):
+    data = stripe(k)
+    assert rs_encode(data, r)[0] == xor_parity(data)
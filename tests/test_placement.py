@@ -0,0 +1,11 @@
+# test_placement.py
+from collections import Counter
+from simulator.placement import DeclusteredPlacement
+
+def test_declustered_load_is_even_when_width_does_not_divide_n():
+    engine = DeclusteredPlacement(5)
+    members = tuple(range(8))       # 3 spare nodes per group, cycle of 8 groups
+    layout = [engine.place(s, members) for s in range(8 * 10)]
+    assert all(len(set(p)) == 5 for p in layout)
+    load = Counter(n for p in layout for n in p)
+    assert set(load.values()) == {50}
@@ -0,0 +1,15 @@
+# test_simulation.py
+import os
+from simulator.run_experiment import Simulation
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+def test_reused_packed_simulation_closes_its_stores(tmp_path):
+    sim = Simulation(mode="draid", store="packed", logpath=None, max_ops=50, verbose=False,
+                     base_dir=str(tmp_path / "data"))
+    sim.run()
+    before = open_fds()
+    for seed in range(5):
+        sim.run(seed=seed)
+    assert open_fds() == before
@@ -0,0 +1,14 @@
+# test_store.py
+from simulator.store import PackedChunkStore
+
+def test_packed_read_is_a_copy_that_survives_rewrite_and_growth(tmp_path):
+    store = PackedChunkStore(tmp_path, slot_size=16, capacity=2)
+    store.write("a", b"old")
+    data = store.read("a")
+    assert isinstance(data, bytes)
+    store.write("a", b"new")
+    for i in range(5):
+        store.write(f"c{i}", bytes([i]) * 16)   # grows and remaps the file twice
+    assert data == b"old" and store.read("a") == b"new"
+    assert store.capacity == 8 and store.read("c4") == bytes([4]) * 16
+    store.close()